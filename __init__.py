@@ -8,26 +8,79 @@ bl_info = {
 }
 
 import bpy
-from . import context, frame_markers, controls, channel, keyframes, bone, timings, addon_preferences, rig_actions, animation_template
-from .work import work_tick
+from . import work, context, metrics, frame_markers, controls, channel, keyframes, bone, timings, addon_preferences, rig_actions, animation_template
+from .work import work_tick, DirtyTracker, Scheduler
+from .startup import Startup
+from .fcurve_index import FCurveIndex, FrameIndex
+from .interfaces import SCG_Cycler_Indexed_Collection
 
 ###############################
 #   Register and Unregister   #
 ###############################
-modules = (bone, frame_markers, keyframes, channel, controls, timings, rig_actions, animation_template, context, addon_preferences)
+modules = (work, bone, frame_markers, keyframes, channel, controls, timings, rig_actions, animation_template, context, metrics, addon_preferences)
 
+# Properties whose changes wake the auto update, by the class that owns them
+# Their own update callbacks queue the work, this makes sure a sleeping scheduler notices
+watched_properties = (
+    (keyframes.SCG_Cycler_Control_Channel_Keyframe, "offset"),
+    (keyframes.SCG_Cycler_Control_Channel_Keyframe, "inverted"),
+    (keyframes.SCG_Cycler_Control_Channel_Keyframe, "marker"),
+    (frame_markers.SCG_Cycler_Frame_Marker, "length"),
+    (timings.SCG_Cycler_Timing, "fps_mode"),
+    (timings.SCG_Cycler_Timing, "animation_length"),
+    (controls.SCG_Cycler_Control, "mirrored"),
+)
+msgbus_owner = object()
+
+def cycler_property_changed():
+    Scheduler().wake()
+
+# Subscriptions don't survive loading a file, so this runs again on load_post
+def subscribe_to_properties():
+    bpy.msgbus.clear_by_owner(msgbus_owner)
+    for key in watched_properties:
+        bpy.msgbus.subscribe_rna(key=key, owner=msgbus_owner, args=(), notify=cycler_property_changed)
+
+# Only what everything else relies on happens here, the panels and the rest follow on a timer so the file opens straight away
 @bpy.app.handlers.persistent
 def initialise_panels(self):
-    bpy.context.scene.scg_cycler_context.update_ui()    
-    if bpy.context.scene.scg_cycler_context.auto_update:
-        bpy.app.timers.register(work_tick)
+    Startup().begin()
+
+# Undo and redo reload the cycler's data, so nothing we looked up before can be trusted
+@bpy.app.handlers.persistent
+def data_reloaded(scene):
+    FCurveIndex().invalidate()
+    FrameIndex().invalidate()
+    SCG_Cycler_Indexed_Collection.invalidate_indexes()
+    DirtyTracker().mark_everything()
+
+# Edits to a rig action's fcurves, from the graph editor or anywhere else, only tell us the action changed
+# The AutoUpdateJob works out which channels were actually touched
+@bpy.app.handlers.persistent
+def action_edited(scene, depsgraph):
+    edited = {update.id.name for update in depsgraph.updates if isinstance(update.id, bpy.types.Action)}
+    if len(edited) == 0:
+        return
+    for rig_action in scene.scg_cycler_context.rig_actions.rig_actions:
+        if rig_action.action is not None and rig_action.action.name in edited:
+            FCurveIndex().invalidate(rig_action.action)
+            DirtyTracker().mark_fcurves_edited(rig_action.name)
 
 def register():
     for m in modules:
         m.register()
     bpy.app.handlers.load_post.append(initialise_panels)
+    bpy.app.handlers.depsgraph_update_post.append(action_edited)
+    bpy.app.handlers.undo_post.append(data_reloaded)
+    bpy.app.handlers.redo_post.append(data_reloaded)
+    subscribe_to_properties()
 
 def unregister():
+    Startup().cancel()
+    bpy.msgbus.clear_by_owner(msgbus_owner)
     for m in reversed(modules):
         m.unregister()
-    bpy.app.handlers.load_post.remove(initialise_panels)
\ No newline at end of file
+    bpy.app.handlers.load_post.remove(initialise_panels)
+    bpy.app.handlers.depsgraph_update_post.remove(action_edited)
+    bpy.app.handlers.undo_post.remove(data_reloaded)
+    bpy.app.handlers.redo_post.remove(data_reloaded)
\ No newline at end of file
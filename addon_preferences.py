@@ -3,13 +3,29 @@ import bpy
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
 from .bone import SCG_Cycler_Whitelist_Path
 from .animation_template import SCG_Cycler_Animation_Template_Path
+from .constants import CONTROL_UI_DEFAULT
 
 class SCG_Cycler_Addon_Preferences(bpy.types.AddonPreferences, Context_Interface):
     bl_idname = __package__
     whitelist_paths : bpy.props.CollectionProperty(type=SCG_Cycler_Whitelist_Path)
     animation_template_paths : bpy.props.CollectionProperty(type=SCG_Cycler_Animation_Template_Path)
 
+    def control_ui_update(self, context):
+        bpy.context.scene.scg_cycler_context.update_ui()
+    control_ui : bpy.props.EnumProperty(name="Control UI", update=control_ui_update, default=CONTROL_UI_DEFAULT, items=(
+        ("LIST", "List", "One list of controls, with the selected control's channels below it"),
+        ("PANELS", "Panels", "A panel for every control and channel, slow to register on big rigs")))
+
+    # Scheduler budgets
+    target_frame_rate : bpy.props.IntProperty(name="Target Frame Rate", description="Viewport frame rate the auto update tries to keep while you interact", default=30, min=1, max=240)
+    work_budget_min : bpy.props.FloatProperty(name="Minimum Work Budget", description="Least time in milliseconds each update gets, even when the viewport is slow", default=4.0, min=0.5, max=1000.0)
+    work_budget_max : bpy.props.FloatProperty(name="Maximum Work Budget", description="Most time in milliseconds each update gets, used while the viewport is idle", default=100.0, min=1.0, max=1000.0)
+    event_driven : bpy.props.BoolProperty(name="Event Driven", description="Stop checking for work while nothing changes, and start again when the rig, its timings or its action are edited", default=True)
+    idle_interval_max : bpy.props.FloatProperty(name="Maximum Idle Interval", description="Longest time in seconds between updates while there is nothing to do", default=2.0, min=0.05, max=60.0, unit="TIME", subtype="TIME")
+
     def draw(self, context):
+        self.layout.row().prop(self, "control_ui", expand=True)
+
         row = self.layout.row()
         row.label(text="Rig Bone Whitelist Paths")
         column = row.column()
@@ -36,6 +52,20 @@ class SCG_Cycler_Addon_Preferences(bpy.types.AddonPreferences, Context_Interface
             remove_path = column.operator("scg_cycler.remove_animation_template_path")
             remove_path.index = index
 
+        row = self.layout.row()
+        row.label(text="Auto Update Scheduler")
+        column = row.column()
+        box = column.box()
+        box.row().prop(self, "target_frame_rate")
+        box_row = box.row()
+        box_row.prop(self, "work_budget_min")
+        box_row.prop(self, "work_budget_max")
+        box_row = box.row()
+        box_row.prop(self, "event_driven")
+        idle_interval = box_row.row()
+        idle_interval.enabled = not self.event_driven
+        idle_interval.prop(self, "idle_interval_max")
+
 ###############################
 #   Register and Unregister   #
 ###############################
@@ -1,97 +1,29 @@
 import bpy
 
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
-from .interfaces import SCG_Cycler_Collection_Wrapper as Collection_Wrapper
 from .interfaces import SCG_Cycler_Loads_From_JSON as Loads_From_JSON
-from .controls import SCG_Cycler_Controls
-from .timings import SCG_Cycler_Timing
+from .library_index import LibraryIndex
 import os
 import json
 
-class SCG_Cycler_Animation_Template_Keyframe(bpy.types.PropertyGroup):
-    marker : bpy.props.StringProperty()
-    offset : bpy.props.FloatProperty()
-    inverted : bpy.props.BoolProperty()
-
-    @property
-    def json_data(self):
-        return {"marker":self.marker, "offset":self.offset, "inverted":self.inverted}
-    def load_from_json_data(self, json_data):
-        self.marker = json_data["marker"]
-        self.offset = json_data["offset"]
-        self.inverted = json_data["inverted"]
-
-class SCG_Cycler_Animation_Template_Keyframes(bpy.types.PropertyGroup, Collection_Wrapper):
-    children : bpy.props.CollectionProperty(type=SCG_Cycler_Animation_Template_Keyframe)
-
-    @property
-    def json_data(self):
-        return {"children":[child.json_data for child in self]}
-    def load_from_json_data(self, json_data):
-        for keyframe_data in json_data["children"]:
-            new_keyframe = self.children.add()
-            new_keyframe.load_from_json_data(keyframe_data)
-
-class SCG_Cycler_Animation_Template_Channel(bpy.types.PropertyGroup, Collection_Wrapper):
-    type : bpy.props.StringProperty()
-    axis : bpy.props.StringProperty()
-    parent_name : bpy.props.StringProperty()
-    children : bpy.props.PointerProperty(type=SCG_Cycler_Animation_Template_Keyframes)
-
-    @property
-    def json_data(self):
-        return {"type":self.type, "axis":self.axis, "parent_name":self.parent_name, "children":self.children.json_data}
-    def load_from_json_data(self, json_data):
-        self.type = json_data["type"]
-        self.axis = json_data["axis"]
-        self.parent_name = json_data["parent_name"]
-        self.children.load_from_json_data(json_data["children"])
-
-class SCG_Cycler_Animation_Template_Channels(bpy.types.PropertyGroup, Collection_Wrapper):
-    children : bpy.props.CollectionProperty(type=SCG_Cycler_Animation_Template_Channel)
-
-    @property
-    def json_data(self):
-        return [child.json_data for child in self]
-    def load_from_json_data(self, json_data):
-        for index, channel_data in enumerate(json_data):
-            new_child = self.children.add()
-            new_child.load_from_json_data(channel_data)
-
-class SCG_Cycler_Animation_Template_Control(bpy.types.PropertyGroup, Collection_Wrapper):
-    bone_name : bpy.props.StringProperty()
-    mirrored : bpy.props.BoolProperty()
-    children : bpy.props.PointerProperty(type=SCG_Cycler_Animation_Template_Channels)
-
-    @property
-    def json_data(self):
-        return {"bone_name":self.bone_name, "mirrored":self.mirrored, "children":self.children.json_data}
-    def load_from_json_data(self, json_data):
-        self.bone_name = json_data["bone_name"]
-        self.mirrored = json_data["mirrored"]
-        self.children.load_from_json_data(json_data["children"])
-
-class SCG_Cycler_Animation_Template_Controls(bpy.types.PropertyGroup, Collection_Wrapper):
-    children : bpy.props.CollectionProperty(type=SCG_Cycler_Animation_Template_Control)
-
-    @property
-    def json_data(self):
-        return [control.json_data for control in self]
-    def load_from_json_data(self, json_data):
-        self.children.clear()
-        for control_data in json_data:
-            new_control = self.children.add()
-            new_control.load_from_json_data(control_data)
-
-class SCG_Cycler_Animation_Template(bpy.types.PropertyGroup):
+# Only a template's header lives in the .blend, the controls and timings are read from where it came from when it is applied
+class SCG_Cycler_Animation_Template(bpy.types.PropertyGroup, Context_Interface):
     name : bpy.props.StringProperty(name="Name")
-    controls : bpy.props.PointerProperty(type=SCG_Cycler_Animation_Template_Controls)
-    timings : bpy.props.PointerProperty(type=SCG_Cycler_Timing)
+    source_file : bpy.props.StringProperty(name="Source File")
+    marker_count : bpy.props.IntProperty(name="Markers")
+    control_count : bpy.props.IntProperty(name="Controls")
 
+    # None when the file or the entry has gone since the library was last searched
     @property
     def json_data(self):
-        # Return json data of controls and timings
-        return json.dump({"controls":self.controls.json_data, "timings":self.timings.json_data})
+        animation_templates = self.cycler.animation_templates
+        try:
+            if self.source_file != "":
+                return LibraryIndex().entry(self.source_file, animation_templates.json_entries_name, self.name)
+            data = json.loads(bpy.data.texts[animation_templates.data_text_name].as_string())
+            return data[animation_templates.json_entries_name][self.name]
+        except (OSError, ValueError, KeyError):
+            return None
 
 class SCG_Cycler_Animation_Template_Path(bpy.types.PropertyGroup):
     path : bpy.props.StringProperty(name="Path", subtype="DIR_PATH")
@@ -113,9 +45,19 @@ class SCG_Cycler_Animation_Templates(bpy.types.PropertyGroup, Context_Interface,
 
     current_animation_template_name : bpy.props.StringProperty(name="Animation Template")
 
-    def set_child_from_json_data(self, child, json_data):
-        child.timings.load_from_json_data(json_data["timings"])
-        child.controls.load_from_json_data(json_data["controls"])
+    def set_child_from_header(self, child, header):
+        child.marker_count = header["marker_count"]
+        child.control_count = header["control_count"]
+        # Templates used to be built in full, drop what older files stored
+        for key in ("controls", "timings"):
+            if key in child:
+                del child[key]
+
+    def get(self, name):
+        for child in self:
+            if child.name == name:
+                return child
+        return None
 
 #################
 #   Operators   #
@@ -146,10 +88,12 @@ class SCG_CYCLER_OT_Load_Animation_Template(bpy.types.Operator, Context_Interfac
     bl_description = "Load Animation Template"
 
     def execute(self, context):
-        for animation_template in self.cycler.animation_templates:
-            if animation_template.name == self.cycler.animation_templates.current_animation_template_name:
-                self.cycler.rig_action.update_from_animation_template(animation_template)
-                #self.cycler.update_ui()
+        animation_template = self.cycler.animation_templates.get(self.cycler.animation_templates.current_animation_template_name)
+        if animation_template is None:
+            return {"CANCELLED"}
+        if not self.cycler.rig_action.update_from_animation_template(animation_template):
+            self.report({"WARNING"}, "Animation Template {0} couldn't be read from {1}, refresh the templates".format(animation_template.name, animation_template.source_file or "the text datablock"))
+            return {"CANCELLED"}
         return {"FINISHED"}
 
 class SCG_CYCLER_OT_Add_Animation_Template_Path(bpy.types.Operator):
@@ -175,7 +119,7 @@ class SCG_CYCLER_OT_Remove_Animation_Template_Path(bpy.types.Operator):
 ###############################
 #   Register and Unregister   #
 ###############################
-classes = (SCG_Cycler_Animation_Template_Keyframe, SCG_Cycler_Animation_Template_Keyframes, SCG_Cycler_Animation_Template_Channel, SCG_Cycler_Animation_Template_Channels, SCG_Cycler_Animation_Template_Control, SCG_Cycler_Animation_Template_Controls, SCG_Cycler_Animation_Template, SCG_Cycler_Animation_Template_Path, SCG_Cycler_Animation_Templates, SCG_CYCLER_OT_Refresh_Animation_Templates, SCG_CYCLER_OT_Save_Animation_Template, SCG_CYCLER_OT_Load_Animation_Template, SCG_CYCLER_OT_Add_Animation_Template_Path, SCG_CYCLER_OT_Remove_Animation_Template_Path)
+classes = (SCG_Cycler_Animation_Template, SCG_Cycler_Animation_Template_Path, SCG_Cycler_Animation_Templates, SCG_CYCLER_OT_Refresh_Animation_Templates, SCG_CYCLER_OT_Save_Animation_Template, SCG_CYCLER_OT_Load_Animation_Template, SCG_CYCLER_OT_Add_Animation_Template_Path, SCG_CYCLER_OT_Remove_Animation_Template_Path)
 
 def register():
     from bpy.utils import register_class
@@ -0,0 +1,154 @@
+import os
+import sys
+import random
+import importlib
+
+# Benchmarks the cycler's jobs on a synthetic rig, run inside Blender
+#   blender -b --factory-startup --python benchmarks/bench_cycler.py -- --controls 150 --output cycler.json
+#   blender -b --factory-startup --python benchmarks/bench_cycler.py -- --controls 150 --baseline cycler.json
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import parse_arguments, config, timed, report
+
+# Import the addon from the folder this script lives in
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(addon_directory))
+addon = importlib.import_module(os.path.basename(addon_directory))
+work = importlib.import_module(addon.__name__ + ".work")
+constants = importlib.import_module(addon.__name__ + ".constants")
+panel = importlib.import_module(addon.__name__ + ".panel")
+
+# Works through every queued job, the way the timer would if it had all the time in the world
+def drain(limit=1000000):
+    processed = 0
+    while not work.WorkQueue().empty() and processed < limit:
+        work.WorkQueue().process()
+        processed += 1
+    return processed
+
+def bone_names(arguments):
+    names = []
+    mirrored = round(arguments.controls * arguments.mirrored_ratio / 2)
+    for index in range(mirrored):
+        names.append("bone_{0:03d}.L".format(index))
+        names.append("bone_{0:03d}.R".format(index))
+    for index in range(arguments.controls - len(names)):
+        names.append("bone_{0:03d}".format(mirrored + index))
+    return names
+
+def build_armature(names):
+    armature = bpy.data.armatures.new("Benchmark_Armature")
+    rig = bpy.data.objects.new("Benchmark_Rig", armature)
+    bpy.context.scene.collection.objects.link(rig)
+    bpy.context.view_layer.objects.active = rig
+    bpy.ops.object.mode_set(mode="EDIT")
+    for index, name in enumerate(names):
+        bone = armature.edit_bones.new(name)
+        bone.head = (index * 0.1, 0.0, 0.0)
+        bone.tail = (index * 0.1, 0.0, 1.0)
+    bpy.ops.object.mode_set(mode="OBJECT")
+    return rig, armature
+
+def build_action(rig, names, arguments, num_frames):
+    action = bpy.data.actions.new("Benchmark_Action")
+    rig.animation_data_create().action = action
+    rng = random.Random(arguments.seed)
+    for name in names:
+        for type in constants.TYPES:
+            for array_index in range(3):
+                fcurve = action.fcurves.new('pose.bones["{0}"].{1}'.format(name, type), index=array_index, action_group=name)
+                frames = sorted(rng.sample(range(num_frames + 1), min(arguments.density, num_frames + 1)))
+                co = []
+                for frame in frames:
+                    co.extend((frame, rng.uniform(-1.0, 1.0)))
+                fcurve.keyframe_points.add(len(frames))
+                fcurve.keyframe_points.foreach_set("co", co)
+                fcurve.update()
+    return action
+
+def build_cycler(armature, action, names, arguments):
+    cycler = bpy.context.scene.scg_cycler_context
+    cycler.rig_actions.rig_actions.add()
+    cycler.rig_actions.current_rig_action = len(cycler.rig_actions.rig_actions) - 1
+    rig_action = cycler.rig_action
+    rig_action.armature = armature
+    rig_action.action = action
+    rig_action.timings.fps_mode = str(arguments.fps)
+    rig_action.timings.animation_length = arguments.length
+    for index in range(arguments.markers):
+        marker = rig_action.timings.frame_markers.add()
+        marker.name = "Marker_{0}".format(index)
+        marker.length = 50.0 / arguments.markers
+    drain()
+
+    rng = random.Random(arguments.seed)
+    for name in names:
+        control = rig_action.controls.add(name)
+        control.mirrored = control.mirrors
+        for channel in control:
+            for marker in rig_action.timings.frame_markers:
+                keyframe = channel.add(marker.name.upper())
+                keyframe.offset = rng.uniform(0.0, 10.0)
+                keyframe.inverted = rng.random() < 0.5
+    drain()
+    return rig_action
+
+def main():
+    arguments = parse_arguments("Benchmark the cycler's jobs on a synthetic rig")
+    addon.register()
+    num_frames = round(arguments.length * arguments.fps)
+    names = bone_names(arguments)
+    rig, armature = build_armature(names)
+    action = build_action(rig, names, arguments, num_frames)
+    rig_action = build_cycler(armature, action, names, arguments)
+
+    results = {"config":config(arguments), "blender":bpy.app.version_string, "results":{}}
+
+    # Full sweep with every channel dirty, then a sweep with nothing to do
+    def full_auto_update():
+        work.WorkQueue().add(work.AutoUpdateJob())
+        drain()
+    results["results"]["auto_update_full"] = timed(full_auto_update, arguments.repeat)
+    results["results"]["auto_update_idle"] = timed(lambda: work.AutoUpdateJob(False).work(), arguments.repeat)
+
+    # Flip between two frame rates, so every run has real work to do
+    fps_modes = [str(arguments.fps), "30" if arguments.fps != 30 else "60"]
+    def resize():
+        old_fps = int(fps_modes[0])
+        fps_modes.reverse()
+        work.WorkQueue().add(work.ResizeAnimationJob(arguments.length, arguments.length, old_fps, int(fps_modes[0])))
+        drain()
+    results["results"]["resize_animation"] = timed(resize, arguments.repeat)
+    drain()
+
+    keyframe = rig_action.controls.children[0].children.children[0].children.children[0]
+    offsets = [5.0, 15.0]
+    def move_offset():
+        offsets.reverse()
+        keyframe.offset = offsets[0]
+        drain()
+    results["results"]["update_keyframe_offset"] = timed(move_offset, arguments.repeat)
+
+    template = rig_action.json_data
+    def load_template():
+        rig_action.load_from_json_data(template)
+        drain()
+    results["results"]["template_load"] = timed(load_template, arguments.repeat)
+
+    results["results"]["panel_registration"] = timed(rig_action.controls.add_panels, arguments.repeat, setup=panel.Children_Have_Panels.panel_factory.remove_all_panels)
+
+    # Only the renamed control's panels should be touched, however many controls there are
+    control = rig_action.controls.children[0]
+    control_names = [control.bone_name, control.bone_name + "_renamed"]
+    def rename_control():
+        control_names.reverse()
+        control.bone_name = control_names[0]
+    results["results"]["panel_rename"] = timed(rename_control, arguments.repeat)
+
+    report(results, arguments)
+    addon.unregister()
+
+if __name__ == "__main__":
+    main()
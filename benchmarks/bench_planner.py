@@ -0,0 +1,58 @@
+import os
+import sys
+import random
+import importlib.util
+
+# Benchmarks the keyframe planner on synthetic arrays, runs in plain Python with NumPy, no Blender needed
+#   python benchmarks/bench_planner.py --controls 150 --output planner.json
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import parse_arguments, config, timed, report
+
+# planner.py doesn't import bpy, but the addon package does, so load the module on its own
+spec = importlib.util.spec_from_file_location("planner", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "planner.py"))
+planner = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(planner)
+np = planner.np
+
+def synthetic_fcurve(rng, density, num_frames):
+    frames = np.unique(rng.integers(0, num_frames + 1, size=density)).astype(np.float64)
+    values = rng.uniform(-1.0, 1.0, size=len(frames))
+    handle_left = np.stack([frames - 1.0, values], axis=1)
+    handle_right = np.stack([frames + 1.0, values], axis=1)
+    attributes = {name:np.zeros(len(frames)) for name in planner.ATTRIBUTES}
+    return planner.KeyframeArrays(frames, values, handle_left, handle_right, attributes)
+
+def synthetic_channels(arguments, num_frames):
+    rng = np.random.default_rng(arguments.seed)
+    random.seed(arguments.seed)
+    marker_frames = np.arange(arguments.markers) * (num_frames / 2 / max(arguments.markers, 1))
+    channels = []
+    for control in range(arguments.controls):
+        mirrored = random.random() < arguments.mirrored_ratio
+        for channel in range(9):
+            channels.append(planner.ChannelPlan((control, channel), synthetic_fcurve(rng, arguments.density, num_frames),
+                marker_frames, rng.uniform(0.0, 10.0, size=arguments.markers), rng.random(arguments.markers) < 0.5,
+                default_value=1.0 if channel >= 6 else 0.0,
+                mirrored=mirrored,
+                mirror_fcurve=synthetic_fcurve(rng, arguments.density, num_frames) if mirrored else None,
+                mirror_marker_frames=marker_frames, mirror_offsets=rng.uniform(0.0, 10.0, size=arguments.markers),
+                mirror_invert=channel in (0, 4, 5)))
+    return channels
+
+def main():
+    arguments = parse_arguments("Benchmark the cycler's keyframe planner")
+    num_frames = round(arguments.length * arguments.fps)
+    channels = synthetic_channels(arguments, num_frames)
+    results = {"config":config(arguments), "results":{}}
+    results["results"]["planner"] = timed(lambda: planner.plan(channels, num_frames), arguments.repeat)
+    # Every channel's fcurve stretched to twice its length, the way ResizeAnimationJob remaps it
+    def remap():
+        for channel in channels:
+            old_frames = np.concatenate([channel.marker_frames, channel.marker_frames + num_frames / 2])
+            planner.remap_frames(channel.fcurve.frames, old_frames, old_frames * 2, 0.001)
+    results["results"]["remap"] = timed(remap, arguments.repeat)
+    report(results, arguments)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+
+# Shared helpers for the benchmark scripts: arguments, timing, results and baseline comparison
+
+def parse_arguments(description):
+    # Blender passes the script's own arguments after "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--controls", type=int, default=50, help="Number of controls in the synthetic rig")
+    parser.add_argument("--markers", type=int, default=4, help="Number of frame markers")
+    parser.add_argument("--density", type=int, default=24, help="Keyframe points per fcurve before the cycler runs")
+    parser.add_argument("--mirrored-ratio", type=float, default=0.5, help="Fraction of controls that use their mirror control")
+    parser.add_argument("--fps", type=int, default=24, choices=(24, 30, 60))
+    parser.add_argument("--length", type=float, default=2.0, help="Animation length in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Times each benchmark is run")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="Compare against the results in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline, 0.25 is 25%%")
+    return parser.parse_args(argv)
+
+def config(arguments):
+    return {"controls":arguments.controls, "markers":arguments.markers, "density":arguments.density, "mirrored_ratio":arguments.mirrored_ratio,
+        "fps":arguments.fps, "length":arguments.length, "repeat":arguments.repeat, "seed":arguments.seed}
+
+# Runs setup then function repeat times, only function is timed
+def timed(function, repeat, setup=None):
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start_time = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start_time)
+    return {"min":min(samples), "median":statistics.median(samples), "max":max(samples), "samples":samples}
+
+def write_results(path, results):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=3)
+
+# Prints every benchmark against the baseline, and returns the names of those that got slower than the tolerance allows
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    if baseline.get("config") != results["config"]:
+        print("Warning: baseline was recorded with a different config")
+    regressions = []
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            print("{0:<28} {1:>10.2f} ms   (new)".format(name, result["median"] * 1000))
+            continue
+        ratio = result["median"] / max(baseline["results"][name]["median"], 1e-9)
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print("{0:<28} {1:>10.2f} ms   {2:>6.2f}x baseline{3}".format(name, result["median"] * 1000, ratio, flag))
+    return regressions
+
+def report(results, arguments):
+    for name, result in results["results"].items():
+        print("{0:<28} {1:>10.2f} ms median   {2:>10.2f} ms max".format(name, result["median"] * 1000, result["max"] * 1000))
+    if arguments.output is not None:
+        write_results(arguments.output, results)
+    if arguments.baseline is not None and len(compare(results, arguments.baseline, arguments.tolerance)) > 0:
+        sys.exit(1)
@@ -1,6 +1,7 @@
 import bpy
 import json
 import os
+import fnmatch
 
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
 from .interfaces import SCG_Cycler_Collection_Wrapper as Collection_Wrapper
@@ -47,15 +48,8 @@ class SCG_Cycler_Rig_Bones(bpy.types.PropertyGroup, Context_Interface):
     def current_whitelist_name_updated(self, context):
         for whitelist in self.cycler.rig_bone_whitelists:
             if whitelist.name == self.current_whitelist_name:
-                self.armature_changed()
-                for bone in whitelist.bones:
-                    for index, blacklist_bone in enumerate(self.blacklist):
-                        if bone.name == blacklist_bone.name:
-                            self.blacklist.remove(index)
-                            if not bone.name in self.whitelist_names:
-                                new_bone = self.whitelist.add()
-                                new_bone.name = bone.name
-                            break
+                self.set_whitelist(whitelist.bone_names)
+                return
 
     current_whitelist_name : bpy.props.StringProperty(name="Current Whitelist", update=current_whitelist_name_updated)
 
@@ -74,13 +68,36 @@ class SCG_Cycler_Rig_Bones(bpy.types.PropertyGroup, Context_Interface):
         return []
 
     def armature_changed(self):
+        self.set_whitelist(())
+
+    # Rebuilds both lists in one pass, in the armature's bone order
+    # Names that aren't bones of the armature are ignored
+    def set_whitelist(self, bone_names):
+        bone_names = set(bone_names)
         self.whitelist.clear()
         self.blacklist.clear()
-
         for bone_name in self.bones:
-            new_bone = self.blacklist.add()
+            new_bone = self.whitelist.add() if bone_name in bone_names else self.blacklist.add()
             new_bone.name = bone_name
 
+    # Moves any number of bones from one list to the other, removing them from the back so the indices stay valid
+    def move_bones(self, bone_names, source, target):
+        bone_names = set(bone_names)
+        indices = [index for index, bone in enumerate(source) if bone.name in bone_names]
+        moved = [source[index].name for index in indices]
+        for index in reversed(indices):
+            source.remove(index)
+        for bone_name in moved:
+            new_bone = target.add()
+            new_bone.name = bone_name
+        return len(moved)
+
+    def whitelist_bones(self, bone_names):
+        return self.move_bones(bone_names, self.blacklist, self.whitelist)
+
+    def blacklist_bones(self, bone_names):
+        return self.move_bones(bone_names, self.whitelist, self.blacklist)
+
     @property
     def json_data(self):
         return self.whitelist_names
@@ -100,9 +117,9 @@ class SCG_Cycler_Rig_Bone_Whitelists(bpy.types.PropertyGroup, Context_Interface,
         return "{\"whitelists\":{}}"
     children : bpy.props.CollectionProperty(type=SCG_Cycler_Whitelist)
 
-    def set_child_from_json_data(self, child, json_data):
+    def set_child_from_header(self, child, header):
         child.bones.clear()
-        for bone_name in json_data:
+        for bone_name in header["bone_names"]:
             new_bone = child.bones.add()
             new_bone.name = bone_name
 
@@ -119,15 +136,9 @@ class SCG_CYCLER_OT_Whitelist_Bone(bpy.types.Operator, Context_Interface):
         return self.cycler.rig_action.rig_bones.blacklist[self.cycler.rig_action.rig_bones.blacklist_current_index].name
 
     def execute(self, context):
-        bone_name = self.bone_name
         if len(self.cycler.rig_action.rig_bones.blacklist) == 0:
             return {"CANCELLED"}
-        whitelist_bone = self.cycler.rig_action.rig_bones.whitelist.add()
-        whitelist_bone.name = bone_name
-        for index, bone in enumerate(self.cycler.rig_action.rig_bones.blacklist):
-            if bone.name == bone_name:
-                self.cycler.rig_action.rig_bones.blacklist.remove(index)
-                break
+        self.cycler.rig_action.rig_bones.whitelist_bones((self.bone_name,))
         return {"FINISHED"}
 
 class SCG_CYCLER_OT_Blacklist_Bone(bpy.types.Operator, Context_Interface):
@@ -140,15 +151,46 @@ class SCG_CYCLER_OT_Blacklist_Bone(bpy.types.Operator, Context_Interface):
         return self.cycler.rig_action.rig_bones.whitelist[self.cycler.rig_action.rig_bones.whitelist_current_index].name
 
     def execute(self, context):
-        bone_name = self.bone_name
         if len(self.cycler.rig_action.rig_bones.whitelist) == 0:
             return {"CANCELLED"}
-        for index, bone in enumerate(self.cycler.rig_action.rig_bones.whitelist):
-            if bone.name == bone_name:
-                self.cycler.rig_action.rig_bones.whitelist.remove(index)
-                break
-        blacklist_bone = self.cycler.rig_action.rig_bones.blacklist.add()
-        blacklist_bone.name = bone_name
+        self.cycler.rig_action.rig_bones.blacklist_bones((self.bone_name,))
+        return {"FINISHED"}
+
+# Moves every bone matching a pattern, or every selected pose bone, at once
+class SCG_Cycler_Bulk_Bone_Move:
+    pattern : bpy.props.StringProperty(name="Pattern", description="Bone names to move, * and ? match anything, like *.L or finger_*", default="*")
+    selected_only : bpy.props.BoolProperty(name="Selected Pose Bones", description="Only move bones selected in pose mode")
+
+    def bone_names(self, context, source):
+        names = [bone.name for bone in source if fnmatch.fnmatchcase(bone.name, self.pattern)]
+        if self.selected_only:
+            selected = {bone.name for bone in (context.selected_pose_bones or ())}
+            names = [name for name in names if name in selected]
+        return names
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+class SCG_CYCLER_OT_Whitelist_Bones(bpy.types.Operator, Context_Interface, SCG_Cycler_Bulk_Bone_Move):
+    bl_idname = "scg_cycler.whitelist_bones"
+    bl_label = ">>"
+    bl_description = "Move every matching Bone to the Whitelist"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        rig_bones = self.cycler.rig_action.rig_bones
+        rig_bones.whitelist_bones(self.bone_names(context, rig_bones.blacklist))
+        return {"FINISHED"}
+
+class SCG_CYCLER_OT_Blacklist_Bones(bpy.types.Operator, Context_Interface, SCG_Cycler_Bulk_Bone_Move):
+    bl_idname = "scg_cycler.blacklist_bones"
+    bl_label = "<<"
+    bl_description = "Move every matching Bone to the Blacklist"
+    bl_options = {"REGISTER", "UNDO"}
+
+    def execute(self, context):
+        rig_bones = self.cycler.rig_action.rig_bones
+        rig_bones.blacklist_bones(self.bone_names(context, rig_bones.whitelist))
         return {"FINISHED"}
 
 class SCG_CYCLER_OT_Add_Whitelist_Path(bpy.types.Operator, Context_Interface):
@@ -231,6 +273,10 @@ class SCG_CYCLER_PT_Rig_Bones_Panel(bpy.types.Panel, Context_Interface):
         whitelist = row.operator("scg_cycler.whitelist_bone")
         row = buttons_column.row()
         blacklist = row.operator("scg_cycler.blacklist_bone")
+        row = buttons_column.row()
+        row.operator("scg_cycler.whitelist_bones")
+        row = buttons_column.row()
+        row.operator("scg_cycler.blacklist_bones")
         
         whitelist_column = main_row.column()
         whitelist_row = whitelist_column.row()
@@ -241,7 +287,7 @@ class SCG_CYCLER_PT_Rig_Bones_Panel(bpy.types.Panel, Context_Interface):
 ###############################
 #   Register and Unregister   #
 ###############################
-classes = (SCG_Cycler_Bone_Reference, SCG_Cycler_Whitelist_Path, SCG_Cycler_Whitelist, SCG_Cycler_Rig_Bones, SCG_Cycler_Rig_Bone_Whitelists, SCG_CYCLER_OT_Whitelist_Bone, SCG_CYCLER_OT_Blacklist_Bone, SCG_CYCLER_OT_Add_Whitelist_Path, SCG_CYCLER_OT_Remove_Whitelist_Path, SCG_CYCLER_OT_Refresh_Whitelists, SCG_CYCLER_OT_Save_Whitelist, SCG_CYCLER_UL_Bone_List, SCG_CYCLER_PT_Rig_Bones_Panel)
+classes = (SCG_Cycler_Bone_Reference, SCG_Cycler_Whitelist_Path, SCG_Cycler_Whitelist, SCG_Cycler_Rig_Bones, SCG_Cycler_Rig_Bone_Whitelists, SCG_CYCLER_OT_Whitelist_Bone, SCG_CYCLER_OT_Blacklist_Bone, SCG_CYCLER_OT_Whitelist_Bones, SCG_CYCLER_OT_Blacklist_Bones, SCG_CYCLER_OT_Add_Whitelist_Path, SCG_CYCLER_OT_Remove_Whitelist_Path, SCG_CYCLER_OT_Refresh_Whitelists, SCG_CYCLER_OT_Save_Whitelist, SCG_CYCLER_UL_Bone_List, SCG_CYCLER_PT_Rig_Bones_Panel)
 
 def register():
     from bpy.utils import register_class
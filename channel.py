@@ -3,8 +3,11 @@ import json
 
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
 from .interfaces import SCG_Cycler_Collection_Wrapper as Collection_Wrapper
+from .interfaces import SCG_Cycler_Indexed_Collection as Indexed_Collection
 from .constants import *
 from .keyframes import SCG_Cycler_Control_Channel_Keyframes
+from .fcurve_index import FCurveIndex
+from .work import BulkLoad
 
 ###############
 #   Channel   #
@@ -14,7 +17,11 @@ from .keyframes import SCG_Cycler_Control_Channel_Keyframes
 class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Collection_Wrapper):   
 
     # Update properties to respond to type change
+    # The lookups are done lazily after a bulk load
     def type_update(self, context):
+        self.update_keyframe_addresses()
+        if BulkLoad.active:
+            return
         self.update_mirror_channel()
         self.update_fcurve()
         self.update_mirror_fcurve()
@@ -22,6 +29,9 @@ class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Col
     
     # Update properties to respond to type change
     def axis_update(self, context):
+        self.update_keyframe_addresses()
+        if BulkLoad.active:
+            return
         self.update_array_index()
         self.update_mirror_channel()
         self.update_fcurve()
@@ -30,6 +40,9 @@ class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Col
     
     # Update properties to respond to type change
     def parent_name_update(self, context):
+        self.update_keyframe_addresses()
+        if BulkLoad.active:
+            return
         self.update_control()
         self.update_mirror_control()
         self.update_mirror_channel()
@@ -42,8 +55,12 @@ class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Col
 
     children : bpy.props.PointerProperty(type=SCG_Cycler_Control_Channel_Keyframes)
 
+    @property
+    def key(self):
+        return (self.parent_name, self.type, self.axis)
+
     def add(self, marker):
-        return self.children.add(marker)
+        return self.children.add(marker, self.key)
 
     def remove(self, index):
         self.children.remove(index)
@@ -58,7 +75,12 @@ class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Col
         self.type = json_data["type"]
         self.axis = json_data["axis"]
         self.parent_name = json_data["parent_name"]
-        self.children.load_from_json_data(json_data["children"])
+        self.children.load_from_json_data(json_data["children"], self.key)
+
+    # Keyframes find their channel and fcurves through these, so they are rewritten whenever the channel's change
+    def update_keyframe_addresses(self):
+        for keyframe in self.children:
+            keyframe.set_channel_key(*self.key)
 
     ###############
     #   Control   #
@@ -124,10 +146,9 @@ class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Col
     #   FCurve   #
     ##############
     def update_fcurve(self):
-        for fcurve in self.cycler.rig_action.action.fcurves:
-            if self.data_path == fcurve.data_path and self.array_index == fcurve.array_index:
-                self.__fcurve__ = fcurve
-                return
+        fcurve = FCurveIndex().get(self.cycler.rig_action.action, self.data_path, self.array_index)
+        if fcurve is not None:
+            self.__fcurve__ = fcurve
     @property
     def fcurve(self):
         if not hasattr(self, "__fcurve__"):
@@ -140,10 +161,9 @@ class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Col
     def update_mirror_fcurve(self):
         if self.mirror_channel is None:
             return
-        for fcurve in self.cycler.rig_action.action.fcurves:
-            if self.mirror_channel.data_path == fcurve.data_path and self.array_index == fcurve.array_index:
-                self.__mirror_fcurve__ = fcurve
-                return
+        fcurve = FCurveIndex().get(self.cycler.rig_action.action, self.mirror_channel.data_path, self.array_index)
+        if fcurve is not None:
+            self.__mirror_fcurve__ = fcurve
     @property
     def mirror_fcurve(self):
         if not hasattr(self, "__mirror_fcurve__"):
@@ -156,27 +176,29 @@ class SCG_Cycler_Control_Channel(bpy.types.PropertyGroup, Context_Interface, Col
 
 # Channel Collection Property Wrapper
 # Handles adding, removing, getting, length and iteration
-class SCG_Cycler_Control_Channels(bpy.types.PropertyGroup, Context_Interface, Collection_Wrapper):
+class SCG_Cycler_Control_Channels(bpy.types.PropertyGroup, Context_Interface, Indexed_Collection):
     children : bpy.props.CollectionProperty(type=SCG_Cycler_Control_Channel)
+    active_index : bpy.props.IntProperty()
+
+    def child_key(self, child):
+        return (child.type, child.axis)
 
     def add(self, type, axis, parent_name):
         channel = self.children.add()
+        Indexed_Collection.invalidate_indexes()
         channel.type = type
         channel.axis = axis
         channel.parent_name = parent_name
         return channel
     
     def remove(self, type, axis):
-        for index, channel in enumerate(self.children):
-            if channel.type == type and channel.axis == axis:
-                self.children.remove(index)
-                return
+        index = self.find_index((type, axis))
+        if index is not None:
+            self.children.remove(index)
+            Indexed_Collection.invalidate_indexes()
 
     def get(self, type, axis):
-        for channel in self.children:
-            if channel.type == type and channel.axis == axis:
-                return channel
-        return None
+        return self.find((type, axis))
 
     @property
     def json_data(self):
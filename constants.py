@@ -3,4 +3,10 @@ TYPES_ENUM_ITEMS = [("LOCATION", "Location", "Location"), ("ROTATION_EULER", "Ro
 AXIS = ["X", "Y", "Z"]
 AXIS_ENUM_ITEMS = [("X", "X Axis", "X Axis"), ("Y", "Y Axis", "Y Axis"), ("Z", "Z Axis", "Z Axis")]
 FPS_MODES = [24, 30, 60]
-FPS_MODES_ENUM = [("24", "24 fps", "24 Frames per Second"), ("30", "30 fps", "30 Frames per Second"), ("60", "60 fps", "60 Frames per Second")]
\ No newline at end of file
+FPS_MODES_ENUM = [("24", "24 fps", "24 Frames per Second"), ("30", "30 fps", "30 Frames per Second"), ("60", "60 fps", "60 Frames per Second")]
+# Values Blender gives a freshly inserted keyframe, interpolation and handle types come from the user preferences
+KEYFRAME_DEFAULTS = {"easing":"AUTO", "type":"KEYFRAME", "amplitude":0.8, "back":1.70158, "period":4.1}
+# How far apart two frames can be and still count as the same keyframe
+FRAME_TOLERANCE = 0.001
+# Control UI a fresh install starts with, also used while the addon isn't in the preferences
+CONTROL_UI_DEFAULT = "LIST"
@@ -20,6 +20,7 @@ class SCG_Cycler_Context(bpy.types.PropertyGroup):
     # Animation Templates
     animation_templates : bpy.props.PointerProperty(type=SCG_Cycler_Animation_Templates)
     auto_update : bpy.props.BoolProperty()
+    auto_update_all : bpy.props.BoolProperty(name="All Rig Actions", description="Keep every rig action in the scene up to date, not just the selected one")
 
     @property
     def rig_action(self):
@@ -40,7 +41,7 @@ class SCG_CYCLER_OT_Toggle_Auto_Update(bpy.types.Operator, SCG_Cycler_Context_In
         self.cycler.auto_update = not self.cycler.auto_update
         if self.cycler.auto_update:
             bpy.app.timers.register(work_tick)
-        else:
+        elif bpy.app.timers.is_registered(work_tick): # Not registered while the scheduler is asleep
             bpy.app.timers.unregister(work_tick)
         return {"FINISHED"}
 
@@ -67,6 +68,7 @@ class SCG_CYCLER_PT_Context_Panel(bpy.types.Panel, SCG_Cycler_Context_Interface)
         col = row.column()
         button_label = "Disable" if self.cycler.auto_update else "Enable"
         col.operator("scg_cycler.toggle_auto_update", text=button_label)
+        self.layout.row().prop(self.cycler, "auto_update_all")
 
 ###############################
 #   Register and Unregister   #
@@ -3,30 +3,51 @@ import json
 
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
 from .interfaces import SCG_Cycler_Collection_Wrapper as Collection_Wrapper
-from .panel import Children_Have_Panels
+from .interfaces import SCG_Cycler_Indexed_Collection as Indexed_Collection
+from .panel import Children_Have_Panels, panels_enabled
 from .channel import SCG_Cycler_Control_Channels
+from .work import DirtyTracker, BulkLoad
 from .constants import *
 
 ################
 #   Control   #
 ################
+# Panel ids only depend on the bone and channel, so a control's panels can be found again without rebuilding the others
+def control_panel_id(bone_name):
+    return "SCG_CYCLER_PT_{0}_Control_Panel".format(bone_name.upper().replace(".", "_").replace("-", "_"))
+
+def channel_panel_id(bone_name, type, axis):
+    return "SCG_CYCLER_PT_{0}_{1}_{2}_Channel_Panel".format(bone_name.upper().replace(".", "_").replace("-", "_"), type.upper(), axis.upper())
+
 class SCG_Cycler_Control(bpy.types.PropertyGroup, Context_Interface, Collection_Wrapper, Children_Have_Panels):    
     def control_bone_get(self):
         if "bone_name" not in self:
             return ""
         return self["bone_name"]
     def control_bone_set(self, value):
-        if value in [control.bone_name for control in self.cycler.rig_action.controls if self.bone_name != value]: return
+        old_name = self.bone_name
+        # A bulk load has already dropped duplicates, and looking them up would rebuild the index for every control
+        if old_name != value and not BulkLoad.active and self.cycler.rig_action.controls.get(value) is not None: return
         self["bone_name"] = value
+        # Only the renamed control's panels are replaced, the update callback doesn't know the old name
+        if old_name != value:
+            self.panel_factory.remove_group(old_name)
     def control_bone_update(self, context):
+        Indexed_Collection.invalidate_indexes()
         for channel in self:
             channel.parent_name = self.bone_name
-        self.cycler.rig_action.controls.remove_panels()
-        self.cycler.rig_action.controls.add_panels()
+        if BulkLoad.active:
+            return
+        DirtyTracker().mark_control(self.bone_name)
+        self.cycler.rig_action.controls.add_control_panels(self)
 
     bone_name : bpy.props.StringProperty(name="Bone", update=control_bone_update, set=control_bone_set, get=control_bone_get)
     children : bpy.props.PointerProperty(type=SCG_Cycler_Control_Channels)
-    mirrored : bpy.props.BoolProperty(name="Use mirror control")
+    def mirrored_update(self, context):
+        if BulkLoad.active:
+            return
+        DirtyTracker().mark_control(self.bone_name)
+    mirrored : bpy.props.BoolProperty(name="Use mirror control", update=mirrored_update)
 
     def add(self, type, axis):
         return self.children.add(type.upper(), axis.upper(), self.bone_name)
@@ -63,12 +84,9 @@ class SCG_Cycler_Control(bpy.types.PropertyGroup, Context_Interface, Collection_
         new_channel_type = kwargs["channel_type"]
         new_channel_axis = kwargs["channel_axis"]
 
-        label = ""
-        for index, word in enumerate((new_channel_type+"_"+new_channel_axis).split("_")):
-            label += word[0].upper() + word[1:].lower()
-            label += " "
-        id_name = "SCG_CYCLER_PT_{0}_{1}_{2}_Channel_Panel".format(self.bone_name.upper().replace(".", "_").replace("-", "_"), new_channel_type.upper(), new_channel_axis.upper())
-        parent_id = "SCG_CYCLER_PT_{0}_Control_Panel".format(self.bone_name.upper().replace(".", "_").replace("-", "_"))
+        label = channel_label(new_channel_type, new_channel_axis)
+        id_name = channel_panel_id(self.bone_name, new_channel_type, new_channel_axis)
+        parent_id = control_panel_id(self.bone_name)
         class ChannelPanel(bpy.types.Panel, Context_Interface):
             bl_idname = id_name
             bl_label = label
@@ -91,35 +109,20 @@ class SCG_Cycler_Control(bpy.types.PropertyGroup, Context_Interface, Collection_
                 return self.control.get(self.channel_type, self.channel_axis)
 
             def draw(self, context):
-                row = self.layout.row()
-                if len(self.cycler.rig_action.timings.frame_markers) > len(self.channel):
-                    add_operator = row.operator("scg_cycler.add_channel_keyframe")
-                    add_operator.bone_name = self.bone_name
-                    add_operator.channel_type = self.channel_type
-                    add_operator.channel_axis = self.channel_axis
-                for index, keyframe in enumerate(self.channel):
-                    row = self.layout.row()
-                    row.prop(keyframe, "marker")
-                    col = row.column()
-                    col.prop(keyframe, "offset")
-                    if not self.control.mirrored:
-                        col = row.column()
-                        col.prop(keyframe, "inverted")
-                    col = row.column()
-                    remove_operator = col.operator("scg_cycler.remove_channel_keyframe")
-                    remove_operator.bone_name = self.bone_name
-                    remove_operator.channel_type = self.channel_type
-                    remove_operator.channel_axis = self.channel_axis
-                    remove_operator.index = index
+                draw_channel(self.layout, self.cycler.rig_action, self.control, self.channel)
 
         return ChannelPanel
 
+    # Channel panels are grouped under the bone name with the control panel they belong to
     def add_panels(self):
         for type, axis in self.panel_ids:
-            panel_id = "{0}_{1}_{2}".format(self.bone_name.upper().replace(".", "_").replace("-", "_"), type.upper(), axis.upper())
+            panel_id = channel_panel_id(self.bone_name, type, axis)
             if panel_id not in self.panel_factory.panels:
                 new_class = self.create_panel_class(channel_type=type, channel_axis=axis)
-                self.panel_factory.register_new_panel(panel_id, new_class)
+                self.panel_factory.register_new_panel(panel_id, new_class, self.bone_name)
+
+    def remove_panels(self):
+        self.panel_factory.remove_group(self.bone_name)
 
     @property
     def json_data(self):
@@ -132,11 +135,22 @@ class SCG_Cycler_Control(bpy.types.PropertyGroup, Context_Interface, Collection_
 ################
 #   Controls   #
 ################
-class SCG_Cycler_Controls(bpy.types.PropertyGroup, Context_Interface, Collection_Wrapper, Children_Have_Panels):
+class SCG_Cycler_Controls(bpy.types.PropertyGroup, Context_Interface, Indexed_Collection, Children_Have_Panels):
     children : bpy.props.CollectionProperty(type=SCG_Cycler_Control)
+    active_index : bpy.props.IntProperty()
+
+    @property
+    def active_control(self):
+        if 0 <= self.active_index < len(self.children):
+            return self.children[self.active_index]
+        return None
+
+    def child_key(self, child):
+        return child.bone_name
 
     def add(self, name=None):
         control = self.children.add()
+        Indexed_Collection.invalidate_indexes()
         if name is None:
             current_bone_names = [control.bone_name for control in self]
             for bone in self.cycler.rig_action.armature.bones:
@@ -148,19 +162,18 @@ class SCG_Cycler_Controls(bpy.types.PropertyGroup, Context_Interface, Collection
         for type in TYPES:
             for axis in AXIS:
                 control.add(type.upper(), axis.upper())
-        self.add_panels()
+        self.add_control_panels(control)
         return control
 
     def remove(self, index):
+        control = self.children[index]
+        DirtyTracker().mark_control(control.bone_name)
+        control.remove_panels()
         self.children.remove(index)
-        self.remove_panels()
-        self.add_panels()
+        Indexed_Collection.invalidate_indexes()
 
     def get(self, bone_name):
-        for control in self.children:
-            if control.bone_name == bone_name:
-                return control
-        return None
+        return self.find(bone_name)
 
     @property
     def panel_ids(self):
@@ -172,7 +185,7 @@ class SCG_Cycler_Controls(bpy.types.PropertyGroup, Context_Interface, Collection
         name = kwargs["panel_id"]
         
         class ControlPanel(bpy.types.Panel, Context_Interface):
-            bl_idname = "SCG_CYCLER_PT_{0}_Control_Panel".format(name.upper().replace(".", "_").replace("-", "_"))
+            bl_idname = control_panel_id(name)
             bl_label = name
             bl_category = "SCG Cycler"
             bl_space_type = "VIEW_3D"
@@ -188,46 +201,112 @@ class SCG_Cycler_Controls(bpy.types.PropertyGroup, Context_Interface, Collection
 
             @property
             def index(self):
-                for index, control in enumerate(self.cycler.rig_action.controls):
-                    if control.bone_name == self.bone_name:
-                        return index
-                return None
+                return self.cycler.rig_action.controls.find_index(self.bone_name)
 
             def draw(self, context):
-                row = self.layout.row()
                 if self.control is None:
                     return
-                row.prop_search(self.control, "bone_name", self.cycler.rig_action.rig_bones, "whitelist")
-                if self.control.mirrors:
-                    row.column().prop(self.control, "mirrored")
-                remove = row.column().operator("scg_cycler.remove_control")
-                remove.index = self.index
+                draw_control(self.layout, self.cycler.rig_action, self.control, self.index)
         return ControlPanel
 
+    # Registers the panels of one control, for when only that control changed
+    def add_control_panels(self, control):
+        if not panels_enabled() or BulkLoad.active:
+            return
+        panel_id = control_panel_id(control.bone_name)
+        if panel_id not in self.panel_factory.panels:
+            new_class = self.create_panel_class(panel_id=control.bone_name)
+            self.panel_factory.register_new_panel(panel_id, new_class, control.bone_name)
+        control.add_panels()
+
     # Handles adding missing panels
     def add_panels(self):
-        super().add_panels()
         for control in self:
-            control.add_panels()
+            self.add_control_panels(control)
 
-    # Remove invalid panels
+    # Remove invalid panels, or all of them when controls are drawn in a list
+    # One pass over the wanted ids, for when the whole tree may have changed, like another rig action being selected
     def remove_panels(self):
-        super().remove_panels()
+        if not panels_enabled():
+            self.panel_factory.remove_all_panels()
+            return
+        panel_ids = set()
         for control in self:
-            control.remove_panels()
+            panel_ids.add(control_panel_id(control.bone_name))
+            panel_ids.update(channel_panel_id(control.bone_name, type, axis) for type, axis in control.panel_ids)
+        panels_to_remove = [panel_id for panel_id in self.panel_factory.panels if panel_id not in panel_ids]
+        for panel_id in reversed(panels_to_remove):
+            self.panel_factory.remove_panel(panel_id)
 
     @property
     def json_data(self):
         return [control.json_data for control in self]
     def load_from_json_data(self, json_data):
         self.children.clear()
+        Indexed_Collection.invalidate_indexes()
+        bone_names = set()
         for control_data in json_data:
+            if control_data["bone_name"] in bone_names:
+                continue
+            bone_names.add(control_data["bone_name"])
             new_control = self.add(control_data["bone_name"])
             new_control.load_from_json_data(control_data)
 
 ######################
 #   User Interface   #
 ######################
+def channel_label(type, axis):
+    return " ".join(word[0].upper() + word[1:].lower() for word in (type + "_" + axis).split("_"))
+
+# Shared by the control panels and the control list
+def draw_control(layout, rig_action, control, index):
+    row = layout.row()
+    row.prop_search(control, "bone_name", rig_action.rig_bones, "whitelist")
+    if control.mirrors:
+        row.column().prop(control, "mirrored")
+    remove = row.column().operator("scg_cycler.remove_control")
+    remove.index = index
+
+def draw_channel(layout, rig_action, control, channel):
+    row = layout.row()
+    if len(rig_action.timings.frame_markers) > len(channel):
+        add_operator = row.operator("scg_cycler.add_channel_keyframe")
+        add_operator.bone_name = control.bone_name
+        add_operator.channel_type = channel.type
+        add_operator.channel_axis = channel.axis
+    for index, keyframe in enumerate(channel):
+        row = layout.row()
+        row.prop(keyframe, "marker")
+        col = row.column()
+        col.prop(keyframe, "offset")
+        if not control.mirrored:
+            col = row.column()
+            col.prop(keyframe, "inverted")
+        col = row.column()
+        remove_operator = col.operator("scg_cycler.remove_channel_keyframe")
+        remove_operator.bone_name = control.bone_name
+        remove_operator.channel_type = channel.type
+        remove_operator.channel_axis = channel.axis
+        remove_operator.index = index
+
+# Only the rows in view are drawn, however many controls the rig has
+class SCG_CYCLER_UL_Controls(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        layout.label(text=item.bone_name, icon="BONE_DATA")
+        if item.mirrored:
+            layout.label(text="Mirrored")
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        flags = bpy.types.UI_UL_list.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "bone_name")
+        order = bpy.types.UI_UL_list.sort_items_by_name(items, "bone_name") if self.use_filter_sort_alpha else []
+        return flags, order
+
+class SCG_CYCLER_UL_Channels(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        layout.label(text=channel_label(item.type, item.axis))
+        layout.label(text="{0} keyframes".format(len(item)))
+
 class SCG_CYCLER_PT_Controls_Panel(bpy.types.Panel, Context_Interface):
     bl_idname = "SCG_CYCLER_PT_Controls_Panel"
     bl_label = "Controls"
@@ -244,11 +323,43 @@ class SCG_CYCLER_PT_Controls_Panel(bpy.types.Panel, Context_Interface):
         row = self.layout.row()
         row.prop_search(self.cycler.animation_templates, "current_animation_template_name", self.cycler.animation_templates, "children")
         row.column().operator("scg_cycler.load_animation_template")
+        animation_template = self.cycler.animation_templates.get(self.cycler.animation_templates.current_animation_template_name)
+        if animation_template is not None:
+            self.layout.row().label(text="{0} markers, {1} controls".format(animation_template.marker_count, animation_template.control_count))
         row = self.layout.row()
         row.prop(self.cycler.animation_templates, "current_animation_template_name")
         row.column().operator("scg_cycler.save_animation_template")
         self.layout.row().operator("scg_cycler.add_control")
-        
+        if not panels_enabled():
+            controls = self.cycler.rig_action.controls
+            self.layout.template_list("SCG_CYCLER_UL_Controls", "Controls", controls, "children", controls, "active_index")
+
+# The control selected in the list, and its channels
+class SCG_CYCLER_PT_Active_Control_Panel(bpy.types.Panel, Context_Interface):
+    bl_idname = "SCG_CYCLER_PT_Active_Control_Panel"
+    bl_label = "Control"
+    bl_category = "SCG Cycler"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "SCG_CYCLER_PT_Controls_Panel"
+
+    @classmethod
+    def poll(cls, context):
+        rig_action = context.scene.scg_cycler_context.rig_action
+        return not panels_enabled() and rig_action is not None and rig_action.controls.active_control is not None
+
+    def draw(self, context):
+        rig_action = self.cycler.rig_action
+        control = rig_action.controls.active_control
+        draw_control(self.layout, rig_action, control, rig_action.controls.active_index)
+        channels = control.children
+        self.layout.template_list("SCG_CYCLER_UL_Channels", "Channels", channels, "children", channels, "active_index", rows=len(channels.children))
+        if 0 <= channels.active_index < len(channels.children):
+            channel = channels.children[channels.active_index]
+            box = self.layout.box()
+            box.label(text=channel_label(channel.type, channel.axis))
+            draw_channel(box, rig_action, control, channel)
+
 #################
 #   Operators   #
 #################
@@ -275,7 +386,7 @@ class SCG_CYCLER_OT_Remove_Control(bpy.types.Operator, Context_Interface):
 ###############################
 #   Register and Unregister   #
 ###############################
-classes = (SCG_Cycler_Control, SCG_Cycler_Controls, SCG_CYCLER_PT_Controls_Panel, SCG_CYCLER_OT_Add_Control, SCG_CYCLER_OT_Remove_Control)
+classes = (SCG_Cycler_Control, SCG_Cycler_Controls, SCG_CYCLER_UL_Controls, SCG_CYCLER_UL_Channels, SCG_CYCLER_PT_Controls_Panel, SCG_CYCLER_PT_Active_Control_Panel, SCG_CYCLER_OT_Add_Control, SCG_CYCLER_OT_Remove_Control)
 
 def register():
     from bpy.utils import register_class
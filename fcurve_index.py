@@ -0,0 +1,61 @@
+
+# Singleton lookup of an action's fcurves by (data_path, array_index)
+# Built once per action, and rebuilt when fcurves are added or removed, the action is edited or a file is loaded
+class FCurveIndex:
+    indexes = {}
+
+    def index(self, action):
+        key = action.as_pointer()
+        count = len(action.fcurves)
+        if key not in FCurveIndex.indexes or FCurveIndex.indexes[key][0] != count:
+            FCurveIndex.indexes[key] = (count, {(fcurve.data_path, fcurve.array_index):fcurve for fcurve in action.fcurves})
+        return FCurveIndex.indexes[key][1]
+
+    def get(self, action, data_path, array_index):
+        if action is None:
+            return None
+        fcurve = self.index(action).get((data_path, array_index))
+        # Renaming a bone renames the data paths of its fcurves in place
+        if fcurve is not None and (fcurve.data_path != data_path or fcurve.array_index != array_index):
+            self.invalidate(action)
+            fcurve = self.index(action).get((data_path, array_index))
+        return fcurve
+
+    def invalidate(self, action=None):
+        if action is None:
+            FCurveIndex.indexes = {}
+        else:
+            FCurveIndex.indexes.pop(action.as_pointer(), None)
+
+# Singleton lookup of keyframe point indices by frame, per fcurve
+# Every hit is checked against the keyframe point it points at, and a miss rebuilds the index with a single foreach_get
+class FrameIndex:
+    indexes = {}
+
+    def build(self, fcurve):
+        count = len(fcurve.keyframe_points)
+        co = [0.0] * (count * 2)
+        fcurve.keyframe_points.foreach_get("co", co)
+        indexes = {co[index * 2]:index for index in range(count)}
+        FrameIndex.indexes[fcurve.as_pointer()] = indexes
+        return indexes
+
+    def find(self, fcurve, frame):
+        indexes = FrameIndex.indexes.get(fcurve.as_pointer())
+        if indexes is not None and frame in indexes:
+            index = indexes[frame]
+            if index < len(fcurve.keyframe_points) and fcurve.keyframe_points[index].co[0] == frame:
+                return index
+        return self.build(fcurve).get(frame)
+
+    # Keeps the index right after a keyframe point is moved, without reading the fcurve again
+    def moved(self, fcurve, old_frame, new_frame, index):
+        indexes = FrameIndex.indexes.get(fcurve.as_pointer())
+        if indexes is None:
+            return
+        if indexes.get(old_frame) == index:
+            del indexes[old_frame]
+        indexes[new_frame] = index
+
+    def invalidate(self):
+        FrameIndex.indexes = {}
@@ -2,13 +2,16 @@ import bpy
 import json
 
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
-from .work import WorkQueue, UpdateMarkerLengthJob
+from .work import WorkQueue, DirtyTracker, BulkLoad, UpdateMarkerLengthJob
+from .metrics import traced
 
 ####################
 #   Frame Marker   #
 ####################
 class SCG_Cycler_Frame_Marker(bpy.types.PropertyGroup, Context_Interface):
     def update_frame_marker(self, context):
+        if BulkLoad.active:
+            return
         WorkQueue().add(UpdateMarkerLengthJob())
     # Displayed props
     name : bpy.props.StringProperty(name="Name", update=update_frame_marker)
@@ -19,11 +22,13 @@ class SCG_Cycler_Frame_Marker(bpy.types.PropertyGroup, Context_Interface):
             return self["current_length"]
         else:
             return 0.0
+    @traced("set_length")
     def set_length(self, value):
         #bpy.context.scene.frame_end
         self["old_length"] = self.length
         self["current_length"] = value
-        WorkQueue().add(UpdateMarkerLengthJob())
+        if not BulkLoad.active:
+            WorkQueue().add(UpdateMarkerLengthJob())
 
     length : bpy.props.FloatProperty(name="Marker Length", get=get_length, set=set_length, default=0.0, min=0.0, max=50.0, subtype="PERCENTAGE", step=10.0)
     
@@ -62,10 +67,12 @@ class SCG_Cycler_Frame_Markers(bpy.types.PropertyGroup, Context_Interface):
 
     def add(self):
         marker = self.markers.add()
+        DirtyTracker().mark_all()
         return marker
 
     def remove(self, index):
         self.markers.remove(index)
+        DirtyTracker().mark_all()
 
     @property
     def json_data(self):
@@ -0,0 +1,58 @@
+import bpy
+import sys
+import json
+import time
+import argparse
+import importlib
+
+from .work import Scheduler, DirtyTracker
+
+################
+#   Headless   #
+################
+
+# Prefix of the line main() prints its result on, so scripts/batch_cycle.py can find it among Blender's own output
+RESULT_PREFIX = "SCG_CYCLER_RESULT "
+
+# Re-applies the cycler to the open file, synchronously, instead of waiting for work_tick
+#   blender -b file.blend --python-exit-code 1 --python-expr "import scg_cycler.headless; scg_cycler.headless.main()" -- --no-save
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Re-apply the cycler to a .blend file and save it")
+    parser.add_argument("--no-save", action="store_true", help="Leave the file as it is on disk")
+    parser.add_argument("--max-jobs", type=int, default=1000000, help="Give up after this many jobs")
+    arguments = parser.parse_args(argv)
+
+    result = cycle_file(save=not arguments.no_save, max_jobs=arguments.max_jobs)
+    print(RESULT_PREFIX + json.dumps(result))
+    if not result["converged"]:
+        raise RuntimeError("Cycler did not converge within {0} jobs".format(arguments.max_jobs))
+
+def ensure_registered():
+    # The addon is only registered already if it is enabled in the preferences Blender started with
+    if hasattr(bpy.types.Scene, "scg_cycler_context"):
+        return
+    addon = importlib.import_module(__package__)
+    addon.register()
+    # The file was loaded before we were registered, so our load_post handler never saw it
+    addon.data_reloaded(bpy.context.scene)
+
+# Every rig action in the scene is brought up to date, not just the selected one
+def cycle_file(save=True, max_jobs=1000000):
+    ensure_registered()
+    rig_actions = bpy.context.scene.scg_cycler_context.rig_actions.rig_actions
+    result = {"file":bpy.data.filepath, "rig_actions":[rig_action.name for rig_action in rig_actions if rig_action.action is not None],
+        "jobs":0, "converged":True, "cycle_time":0.0, "save_time":0.0}
+    if len(result["rig_actions"]) == 0:
+        return result
+
+    start_time = time.perf_counter()
+    DirtyTracker().mark_everything()
+    result["jobs"], result["converged"] = Scheduler().converge(max_jobs, all_rig_actions=True)
+    result["cycle_time"] = time.perf_counter() - start_time
+
+    if save and result["converged"]:
+        start_time = time.perf_counter()
+        bpy.ops.wm.save_mainfile()
+        result["save_time"] = time.perf_counter() - start_time
+    return result
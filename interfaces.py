@@ -1,6 +1,10 @@
 import bpy
 import os
 import json
+import hashlib
+
+from .library_index import LibraryIndex
+from .library_format import entry_header
 
 class SCG_Cycler_Context_Interface:
     @property
@@ -13,36 +17,87 @@ class SCG_Cycler_Collection_Wrapper:
     def __len__(self):
         return len(self.children)
 
+# Keeps a map from each child's key to its position, so get() doesn't have to scan the collection
+# Maps are keyed by the collection's pointer, and thrown away whenever a collection anywhere is added to,
+# removed from or renamed, or the file is loaded or undone, since any of those can move collections in memory
+class SCG_Cycler_Indexed_Collection(SCG_Cycler_Collection_Wrapper):
+    child_indexes = {}
+
+    def child_key(self, child):
+        return child.name
+
+    def build_indexes(self):
+        indexes = {}
+        for index, child in enumerate(self.children):
+            indexes.setdefault(self.child_key(child), index)
+        SCG_Cycler_Indexed_Collection.child_indexes[self.as_pointer()] = (len(self.children), indexes)
+        return indexes
+
+    def find_index(self, key):
+        cached = SCG_Cycler_Indexed_Collection.child_indexes.get(self.as_pointer())
+        if cached is not None and cached[0] == len(self.children):
+            index = cached[1].get(key)
+            # A hit is checked against the child, a miss could be a child whose key changed in place, like a renamed control,
+            # so either way something changed without telling us, and the map is built again
+            if index is not None and self.child_key(self.children[index]) == key:
+                return index
+        return self.build_indexes().get(key)
+
+    def find(self, key):
+        index = self.find_index(key)
+        return self.children[index] if index is not None else None
+
+    @staticmethod
+    def invalidate_indexes():
+        SCG_Cycler_Indexed_Collection.child_indexes = {}
+
+# Children remember which version of which file they were loaded from, in their "source" property,
+# so a search only loads the entries that are new or changed, and removes the ones no file has anymore
+# "source_file" is the file itself, or empty for the text datablock
+# Children are set from entry headers, see library_format.entry_header, the bodies stay in their files
 class SCG_Cycler_Loads_From_JSON(SCG_Cycler_Collection_Wrapper):
     def search(self):
-        self.children.clear()
-        for path in self.paths:
-            directory = os.fsencode(path.path)
-            for file in os.listdir(directory):
-                filename = os.fsdecode(file)
-                if filename.endswith(".json"):
-                    file_path = path.path + filename
-                    f = open(file_path)
-                    data = json.load(f)
-                    f.close()
-                    self.load(data)
+        sources = LibraryIndex().read([path.path for path in self.paths if path.path != ""], self.json_entries_name)
         if self.data_text_name in bpy.data.texts:
             data_string = bpy.data.texts[self.data_text_name].as_string()
-            data = json.loads(data_string)
-            self.load(data)
+            entries = json.loads(data_string).get(self.json_entries_name, {})
+            headers = {entry_name:entry_header(self.json_entries_name, entry_data) for entry_name, entry_data in entries.items()}
+            sources.append(("", "text|" + hashlib.sha1(data_string.encode()).hexdigest(), headers))
+
+        # Later sources win, the same as loading them one after the other
+        wanted = {}
+        for source_file, signature, headers in sources:
+            for entry_name, header in headers.items():
+                wanted[entry_name] = (source_file, signature, header)
+
+        for index in reversed(range(len(self.children))):
+            if self.children[index].name not in wanted:
+                self.children.remove(index)
+        existing = {child.name:child for child in self}
+        for entry_name, (source_file, signature, header) in wanted.items():
+            child = existing.get(entry_name)
+            if child is not None and child.get("source") == signature:
+                continue
+            if child is None:
+                child = self.children.add()
+                child.name = entry_name
+            child["source_file"] = source_file
+            self.set_child_from_header(child, header)
+            child["source"] = signature
 
     def load(self, json_data):
         if self.json_entries_name not in json_data: return
         entries = json_data[self.json_entries_name]
+        existing = {child.name:child for child in self}
         for entry_name, entry_data in entries.items():
-            if not entry_name in [entry.name for entry in self]:
-                new_entry = self.children.add()
-                new_entry.name = entry_name
-                self.set_child_from_json_data(new_entry, entry_data)
-            else:
-                for child in self:
-                    if child.name == entry_name:
-                        self.set_child_from_json_data(child, entry_data)
+            child = existing.get(entry_name)
+            if child is None:
+                child = self.children.add()
+                child.name = entry_name
+                existing[entry_name] = child
+            child["source_file"] = ""
+            self.set_child_from_header(child, entry_header(self.json_entries_name, entry_data))
+            child["source"] = ""
 
     def create_text_data(self):
         data_text = bpy.data.texts.new(self.data_text_name)
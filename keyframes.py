@@ -3,7 +3,9 @@ import json
 
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
 from .interfaces import SCG_Cycler_Collection_Wrapper as Collection_Wrapper
-from .work import WorkQueue, UpdateKeyframeOffsetJob
+from .interfaces import SCG_Cycler_Indexed_Collection as Indexed_Collection
+from .work import WorkQueue, DirtyTracker, BulkLoad, UpdateKeyframeOffsetJob
+from .metrics import traced
 
 ################
 #   Keyframe   #
@@ -11,34 +13,67 @@ from .work import WorkQueue, UpdateKeyframeOffsetJob
 class SCG_Cycler_Control_Channel_Keyframe(bpy.types.PropertyGroup, Context_Interface):
     def get_frame_marker_enum_items(self, context):
         return [(frame_marker.name.upper(), frame_marker.name, frame_marker.name) for frame_marker in self.cycler.rig_action.timings.frame_markers]
-    def frame_marker_update(self, context):
+    def update_frame_marker(self):
         for frame_marker in self.cycler.rig_action.timings.frame_markers:
             if frame_marker.name.upper() == self.marker.upper():
                 self.__frame_marker__ = frame_marker
                 return
+    def frame_marker_update(self, context):
+        Indexed_Collection.invalidate_indexes()
+        if BulkLoad.active:
+            return
+        self.mark_dirty()
+        self.update_frame_marker()
     marker : bpy.props.EnumProperty(name="Frame Marker", items=get_frame_marker_enum_items, update=frame_marker_update)
 
     def get_offset(self):
         if not "current_offset" in self:
             self["current_offset"] = 0.0
         return self["current_offset"]
+    @traced("set_offset")
     def set_offset(self, value):
         if value > 50.0:
             value = 50.0
         elif value < 0.0:
             value = 0.0
-        if value != self.get_offset():
+        # Nothing to move yet, the auto update after the load writes the keyframes where they belong
+        if BulkLoad.active:
+            self["old_offset"] = value
+            self["current_offset"] = value
+        elif value != self.get_offset():
             self["old_offset"] = self["current_offset"]
             self["current_offset"] = value
-            WorkQueue().add(UpdateKeyframeOffsetJob(self, self["old_offset"], self["current_offset"]))
+            WorkQueue().add(UpdateKeyframeOffsetJob(self.address, self["old_offset"], self["current_offset"]))
 
     offset : bpy.props.FloatProperty(name="Offset", default=0.0, min=0.0, max=50.0, subtype="PERCENTAGE", step=10.0, get=get_offset, set=set_offset)
-    inverted : bpy.props.BoolProperty(name="Inverted")
+    @traced("inverted_update")
+    def inverted_update(self, context):
+        if BulkLoad.active:
+            return
+        self.mark_dirty()
+    inverted : bpy.props.BoolProperty(name="Inverted", update=inverted_update)
+
+    # The channel owning this keyframe, stored by the channel rather than found from our path, see SCG_Cycler_Control_Channel.update_keyframe_addresses
+    def set_channel_key(self, bone_name, type, axis):
+        self["bone_name"] = bone_name
+        self["channel_type"] = type
+        self["channel_axis"] = axis
+    @property
+    def channel_key(self):
+        return (self.get("bone_name", ""), self.get("channel_type", ""), self.get("channel_axis", ""))
+
+    # Where to find this keyframe again: (bone_name, type, axis, marker)
+    @property
+    def address(self):
+        return self.channel_key + (self.marker,)
+
+    def mark_dirty(self):
+        DirtyTracker().mark_channel(*self.channel_key)
 
     @property
     def frame_marker(self):
         if not hasattr(self, "__frame_marker__"):
-            self.frame_marker_update(bpy.context)
+            self.update_frame_marker()
         return self.__frame_marker__
 
     @property
@@ -57,30 +92,36 @@ class SCG_Cycler_Control_Channel_Keyframe(bpy.types.PropertyGroup, Context_Inter
 #################
 #   Keyframes   #
 #################
-class SCG_Cycler_Control_Channel_Keyframes(bpy.types.PropertyGroup, Context_Interface, Collection_Wrapper):
+class SCG_Cycler_Control_Channel_Keyframes(bpy.types.PropertyGroup, Context_Interface, Indexed_Collection):
     children : bpy.props.CollectionProperty(type=SCG_Cycler_Control_Channel_Keyframe)
 
-    def add(self, marker):
+    def child_key(self, child):
+        return child.marker
+
+    # channel_key is (bone_name, type, axis) of the channel owning the collection
+    def add(self, marker, channel_key):
         keyframe = self.children.add()
+        Indexed_Collection.invalidate_indexes()
+        keyframe.set_channel_key(*channel_key)
         keyframe.marker = marker
         return keyframe
     
     def remove(self, index):
+        self.children[index].mark_dirty()
         self.children.remove(index)
+        Indexed_Collection.invalidate_indexes()
 
     def get(self, marker):
-        for keyframe in self.children:
-            if keyframe.marker == marker:
-                return keyframe
-        return None
+        return self.find(marker)
 
     @property
     def json_data(self):
         return {"children":[child.json_data for child in self]}
-    def load_from_json_data(self, json_data):
+    def load_from_json_data(self, json_data, channel_key):
         self.children.clear()
+        Indexed_Collection.invalidate_indexes()
         for keyframe_data in json_data["children"]:
-            new_keyframe = self.add(keyframe_data["marker"])
+            new_keyframe = self.add(keyframe_data["marker"], channel_key)
             new_keyframe.load_from_json_data(keyframe_data)
 
 #################
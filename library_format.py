@@ -0,0 +1,358 @@
+import os
+import mmap
+import struct
+import contextlib
+import collections.abc
+
+# Compact binary container for template and whitelist library files, the same data as the .json files
+# Nothing in here touches bpy, so scripts/convert_library.py can use it outside of Blender
+#
+#   header      magic, version, then where the string table and table of contents start
+#   strings     every bone, marker and key name once, looked up by index
+#   contents    per section ("templates", "whitelists"), each entry's name, where its bytes are and its header (see entry_header)
+#   entries     one encoded value per entry, lists of same shaped dicts like keyframes are stored as packed columns
+#
+# The file is memory mapped, so reading one entry only touches the header, the contents and that entry,
+# and listing a library only touches the header and the contents
+
+EXTENSION = ".scgl"
+MAGIC = b"SCGL"
+VERSION = 2
+HEADER = struct.Struct("<4sHHQQ")   # magic, version, reserved, strings offset, contents offset
+
+# Value tags
+NULL = 0
+FALSE = 1
+TRUE = 2
+INT = 3
+FLOAT = 4
+STRING = 5
+LIST = 6
+DICT = 7
+TABLE = 8   # List of dicts with the same keys in the same order, one packed column per key
+
+# Table column kinds
+BOOL_COLUMN = 1
+INT_COLUMN = 3
+FLOAT_COLUMN = 4
+STRING_COLUMN = 5
+VALUE_COLUMN = 6
+
+UINT = struct.Struct("<I")
+INT64 = struct.Struct("<q")
+FLOAT64 = struct.Struct("<d")
+CONTENTS_ENTRY = struct.Struct("<IQQ")  # name, offset, length, followed by the encoded entry header
+
+INT_MIN = -(1 << 63)
+INT_MAX = (1 << 63) - 1
+
+class LibraryFormatError(ValueError):
+    pass
+
+def is_library_file(path):
+    return path.endswith(EXTENSION)
+
+# The little of an entry a library listing shows, so listing a library doesn't keep every body around
+# Whitelists are only names, so the names are their header
+def entry_header(section, entry_data):
+    if section == "templates":
+        return {"marker_count":len(entry_data["timings"]["frame_markers"]), "control_count":len(entry_data["controls"])}
+    if section == "whitelists":
+        return {"bone_names":list(entry_data)}
+    return {}
+
+###############
+#   Writing   #
+###############
+
+class Encoder:
+    def __init__(self):
+        self.strings = {}
+
+    def intern(self, string):
+        if string not in self.strings:
+            self.strings[string] = len(self.strings)
+        return self.strings[string]
+
+    def encode(self, value, out):
+        if value is None:
+            out.append(bytes((NULL,)))
+        elif value is True:
+            out.append(bytes((TRUE,)))
+        elif value is False:
+            out.append(bytes((FALSE,)))
+        elif isinstance(value, int):
+            if not INT_MIN <= value <= INT_MAX:
+                raise LibraryFormatError("Integer {0} doesn't fit in 64 bits".format(value))
+            out.append(struct.pack("<Bq", INT, value))
+        elif isinstance(value, float):
+            out.append(struct.pack("<Bd", FLOAT, value))
+        elif isinstance(value, str):
+            out.append(struct.pack("<BI", STRING, self.intern(value)))
+        elif isinstance(value, dict):
+            out.append(struct.pack("<BI", DICT, len(value)))
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise LibraryFormatError("Dict keys have to be strings, not {0!r}".format(key))
+                out.append(UINT.pack(self.intern(key)))
+                self.encode(item, out)
+        elif isinstance(value, (list, tuple)):
+            keys = table_keys(value)
+            if keys is None:
+                out.append(struct.pack("<BI", LIST, len(value)))
+                for item in value:
+                    self.encode(item, out)
+            else:
+                self.encode_table(value, keys, out)
+        else:
+            raise LibraryFormatError("Can't store {0!r}".format(value))
+
+    def encode_table(self, rows, keys, out):
+        out.append(struct.pack("<BII", TABLE, len(rows), len(keys)))
+        for key in keys:
+            column = [row[key] for row in rows]
+            out.append(UINT.pack(self.intern(key)))
+            kind = column_kind(column)
+            out.append(bytes((kind,)))
+            if kind == BOOL_COLUMN:
+                out.append(bytes(column))
+            elif kind == INT_COLUMN:
+                out.append(struct.pack("<{0}q".format(len(column)), *column))
+            elif kind == FLOAT_COLUMN:
+                out.append(struct.pack("<{0}d".format(len(column)), *column))
+            elif kind == STRING_COLUMN:
+                out.append(struct.pack("<{0}I".format(len(column)), *[self.intern(string) for string in column]))
+            else:
+                for item in column:
+                    self.encode(item, out)
+
+# Keys shared by every row, or None if the list isn't a table
+def table_keys(rows):
+    if len(rows) < 2 or not all(isinstance(row, dict) for row in rows):
+        return None
+    keys = list(rows[0])
+    if not all(isinstance(key, str) for key in keys) or any(list(row) != keys for row in rows):
+        return None
+    return keys
+
+# bool is checked on its own since it is also an int
+def column_kind(column):
+    if all(isinstance(item, bool) for item in column):
+        return BOOL_COLUMN
+    if all(isinstance(item, int) and not isinstance(item, bool) and INT_MIN <= item <= INT_MAX for item in column):
+        return INT_COLUMN
+    if all(isinstance(item, float) for item in column):
+        return FLOAT_COLUMN
+    if all(isinstance(item, str) for item in column):
+        return STRING_COLUMN
+    return VALUE_COLUMN
+
+# data is what a library .json file holds, {section name: {entry name: entry data}}
+def dumps(data):
+    if not isinstance(data, dict) or not all(isinstance(entries, dict) for entries in data.values()):
+        raise LibraryFormatError("Library data has to be a dict of sections, each a dict of entries")
+    encoder = Encoder()
+    entries = []
+    headers = []
+    for section, section_entries in data.items():
+        encoder.intern(section)
+        for name, entry_data in section_entries.items():
+            encoder.intern(name)
+            out = []
+            encoder.encode(entry_data, out)
+            entries.append(b"".join(out))
+            out = []
+            encoder.encode(entry_header(section, entry_data), out)
+            headers.append(b"".join(out))
+
+    strings = [string.encode("utf-8") for string in encoder.strings]
+    string_offsets = [0]
+    for string in strings:
+        string_offsets.append(string_offsets[-1] + len(string))
+    string_table = struct.pack("<I{0}I".format(len(string_offsets)), len(strings), *string_offsets) + b"".join(strings)
+
+    strings_offset = HEADER.size
+    contents_offset = strings_offset + len(string_table)
+    contents_size = 4 + 8 * len(data) + sum(CONTENTS_ENTRY.size + len(header) for header in headers)
+    offset = contents_offset + contents_size
+    contents = [UINT.pack(len(data))]
+    entry_index = 0
+    for section, section_entries in data.items():
+        contents.append(struct.pack("<II", encoder.strings[section], len(section_entries)))
+        for name in section_entries:
+            length = len(entries[entry_index])
+            contents.append(CONTENTS_ENTRY.pack(encoder.strings[name], offset, length))
+            contents.append(headers[entry_index])
+            offset += length
+            entry_index += 1
+
+    return b"".join([HEADER.pack(MAGIC, VERSION, 0, strings_offset, contents_offset), string_table] + contents + entries)
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(dumps(data))
+
+###############
+#   Reading   #
+###############
+
+class Decoder:
+    def __init__(self, buffer, strings):
+        self.buffer = buffer
+        self.strings = strings
+
+    # Returns the value and the position after it
+    def decode(self, position):
+        tag = self.buffer[position]
+        position += 1
+        if tag == NULL:
+            return None, position
+        if tag == TRUE:
+            return True, position
+        if tag == FALSE:
+            return False, position
+        if tag == INT:
+            return INT64.unpack_from(self.buffer, position)[0], position + 8
+        if tag == FLOAT:
+            return FLOAT64.unpack_from(self.buffer, position)[0], position + 8
+        if tag == STRING:
+            return self.strings[UINT.unpack_from(self.buffer, position)[0]], position + 4
+        if tag == LIST:
+            count = UINT.unpack_from(self.buffer, position)[0]
+            position += 4
+            items = []
+            for _ in range(count):
+                item, position = self.decode(position)
+                items.append(item)
+            return items, position
+        if tag == DICT:
+            count = UINT.unpack_from(self.buffer, position)[0]
+            position += 4
+            items = {}
+            for _ in range(count):
+                key = self.strings[UINT.unpack_from(self.buffer, position)[0]]
+                items[key], position = self.decode(position + 4)
+            return items, position
+        if tag == TABLE:
+            return self.decode_table(position)
+        raise LibraryFormatError("Unknown value tag {0} at {1}".format(tag, position - 1))
+
+    def decode_table(self, position):
+        rows, count = struct.unpack_from("<II", self.buffer, position)
+        position += 8
+        keys = []
+        columns = []
+        for _ in range(count):
+            keys.append(self.strings[UINT.unpack_from(self.buffer, position)[0]])
+            kind = self.buffer[position + 4]
+            position += 5
+            if kind == BOOL_COLUMN:
+                column = [item != 0 for item in self.buffer[position:position + rows]]
+                position += rows
+            elif kind == INT_COLUMN:
+                column = list(struct.unpack_from("<{0}q".format(rows), self.buffer, position))
+                position += 8 * rows
+            elif kind == FLOAT_COLUMN:
+                column = list(struct.unpack_from("<{0}d".format(rows), self.buffer, position))
+                position += 8 * rows
+            elif kind == STRING_COLUMN:
+                column = [self.strings[index] for index in struct.unpack_from("<{0}I".format(rows), self.buffer, position)]
+                position += 4 * rows
+            elif kind == VALUE_COLUMN:
+                column = []
+                for _ in range(rows):
+                    item, position = self.decode(position)
+                    column.append(item)
+            else:
+                raise LibraryFormatError("Unknown column kind {0} at {1}".format(kind, position - 1))
+            columns.append(column)
+        return [dict(zip(keys, row)) for row in zip(*columns)], position
+
+# Table of contents of one library file, entries are read from the file when they are asked for
+# The file is only mapped while something is being read from it, so it can still be replaced on disk
+class LibraryReader:
+    def __init__(self, path):
+        self.path = path
+        self.sections = {}  # section name -> {entry name: (offset, length)}
+        self.headers = {}   # section name -> {entry name: header}
+        with self.mapped() as buffer:
+            magic, version, _, strings_offset, contents_offset = HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC:
+                raise LibraryFormatError("{0} is not a library file".format(path))
+            if version != VERSION:
+                raise LibraryFormatError("{0} is version {1}, only version {2} can be read".format(path, version, VERSION))
+            # Names are shared between entries, so there are few enough to decode them all up front
+            string_count = UINT.unpack_from(buffer, strings_offset)[0]
+            string_offsets = struct.unpack_from("<{0}I".format(string_count + 1), buffer, strings_offset + 4)
+            strings_start = strings_offset + 4 * (string_count + 2)
+            blob = buffer[strings_start:strings_start + string_offsets[-1]]
+            self.strings = [blob[string_offsets[index]:string_offsets[index + 1]].decode("utf-8") for index in range(string_count)]
+            decoder = self.decoder(buffer)
+            position = contents_offset
+            section_count = UINT.unpack_from(buffer, position)[0]
+            position += 4
+            for _ in range(section_count):
+                section, entry_count = struct.unpack_from("<II", buffer, position)
+                position += 8
+                entries = self.sections.setdefault(self.strings[section], {})
+                headers = self.headers.setdefault(self.strings[section], {})
+                for _ in range(entry_count):
+                    name, offset, length = CONTENTS_ENTRY.unpack_from(buffer, position)
+                    entries[self.strings[name]] = (offset, length)
+                    headers[self.strings[name]], position = decoder.decode(position + CONTENTS_ENTRY.size)
+
+    @contextlib.contextmanager
+    def mapped(self):
+        with open(self.path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0: # Empty files can't be mapped
+                raise LibraryFormatError("{0} is empty".format(self.path))
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+
+    def decoder(self, buffer):
+        return Decoder(buffer, self.strings)
+
+    def entry(self, section, name):
+        offset, length = self.sections[section][name]
+        with self.mapped() as buffer:
+            value, end = self.decoder(buffer).decode(offset)
+        if end != offset + length:
+            raise LibraryFormatError("Entry {0} in {1} is corrupt".format(name, self.path))
+        return value
+
+    # The whole file, the same as the .json it was written from
+    @property
+    def json_data(self):
+        data = {}
+        with self.mapped() as buffer:
+            decoder = self.decoder(buffer)
+            for section, entries in self.sections.items():
+                data[section] = {name:decoder.decode(offset)[0] for name, (offset, length) in entries.items()}
+        return data
+
+    # Looks like the parsed .json, {section name: {entry name: entry data}}, but only reads an entry when it is looked up
+    @property
+    def data(self):
+        return {section:LibraryEntries(self, section) for section in self.sections}
+
+class LibraryEntries(collections.abc.Mapping):
+    def __init__(self, reader, section):
+        self.reader = reader
+        self.section = section
+
+    def __getitem__(self, name):
+        if name not in self.reader.sections[self.section]:
+            raise KeyError(name)
+        return self.reader.entry(self.section, name)
+
+    def __iter__(self):
+        return iter(self.reader.sections[self.section])
+
+    def __len__(self):
+        return len(self.reader.sections[self.section])
+
+    def __contains__(self, name):
+        return name in self.reader.sections[self.section]
+
+def read(path):
+    return LibraryReader(path).json_data
@@ -0,0 +1,92 @@
+import bpy
+import os
+import json
+
+from .library_format import LibraryReader, is_library_file, entry_header, EXTENSION
+
+#####################
+#   Library Index   #
+#####################
+
+# Singleton cache of the entry headers in the template and whitelist library paths, kept on disk between sessions
+# Files are keyed by path and only read again when their modification time or size changes,
+# so refreshing a large shared library only costs a directory listing
+# Only headers are kept, see library_format.entry_header, bodies are read from their file when an entry is applied
+class LibraryIndex:
+    version = 2
+    files = None        # path -> {"mtime":..., "size":..., "headers":{section:{entry name:header}}}
+    changed = False
+
+    @property
+    def index_path(self):
+        return os.path.join(bpy.utils.user_resource("CONFIG", path="scg_cycler", create=True), "library_index.json")
+
+    def load_index(self):
+        if LibraryIndex.files is not None:
+            return
+        LibraryIndex.files = {}
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        if index.get("version") == LibraryIndex.version:
+            LibraryIndex.files = index["files"]
+
+    def save_index(self):
+        if not LibraryIndex.changed:
+            return
+        with open(self.index_path, "w") as f:
+            json.dump({"version":LibraryIndex.version, "files":LibraryIndex.files}, f)
+        LibraryIndex.changed = False
+
+    # The file's entry in the index, reading the section's headers again if the file changed
+    def cached(self, path, stat, section):
+        cached = LibraryIndex.files.get(path)
+        if cached is None or cached["mtime"] != stat.st_mtime_ns or cached["size"] != stat.st_size:
+            cached = {"mtime":stat.st_mtime_ns, "size":stat.st_size, "headers":{}}
+            LibraryIndex.files[path] = cached
+            LibraryIndex.changed = True
+        if section not in cached["headers"]:
+            cached["headers"][section] = self.read_headers(path, section)
+            LibraryIndex.changed = True
+        return cached
+
+    # Binary files carry their headers in the table of contents, so no body is decoded for them
+    def read_headers(self, path, section):
+        if is_library_file(path):
+            return LibraryReader(path).headers.get(section, {})
+        with open(path) as f:
+            entries = json.load(f).get(section, {})
+        return {name:entry_header(section, entry_data) for name, entry_data in entries.items()}
+
+    # Body of a single entry, read from its file now rather than kept around
+    def entry(self, path, section, name):
+        if is_library_file(path):
+            return LibraryReader(path).entry(section, name)
+        with open(path) as f:
+            return json.load(f)[section][name]
+
+    # Returns (path, signature, headers) for every .json and binary library file in the directories, in the order they should be loaded
+    # The signature changes whenever the file does, so callers can tell which entries need loading again
+    def read(self, directories, section):
+        self.load_index()
+        sources = []
+        for directory in directories:
+            directory = os.path.normpath(directory)
+            if not os.path.isdir(directory):
+                continue
+            seen = set()
+            with os.scandir(directory) as entries:
+                library_files = sorted((entry for entry in entries if (entry.name.endswith(".json") or entry.name.endswith(EXTENSION)) and entry.is_file()), key=lambda entry: entry.name)
+            for entry in library_files:
+                path = os.path.join(directory, entry.name)
+                seen.add(path)
+                cached = self.cached(path, entry.stat(), section)
+                sources.append((path, "{0}|{1}|{2}".format(path, cached["mtime"], cached["size"]), cached["headers"][section]))
+            # Files that were deleted from the directory
+            for path in [path for path in LibraryIndex.files if os.path.dirname(path) == directory and path not in seen]:
+                del LibraryIndex.files[path]
+                LibraryIndex.changed = True
+        self.save_index()
+        return sources
@@ -0,0 +1,296 @@
+import bpy
+import os
+import json
+import time
+import functools
+import threading
+import collections
+
+from bpy_extras.io_utils import ExportHelper
+from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
+
+####################
+#   Work Metrics   #
+####################
+
+# Per job type numbers for the metrics panel
+class JobTypeMetrics:
+    def __init__(self):
+        self.count = 0
+        self.durations = collections.deque(maxlen=WorkMetrics.samples)
+        self.latencies = collections.deque(maxlen=WorkMetrics.samples)
+        self.max_duration = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def json_data(self):
+        return {"count":self.count,
+            "duration":{"p50":percentile(self.durations, 0.5), "p95":percentile(self.durations, 0.95), "max":self.max_duration},
+            "latency":{"p50":percentile(self.latencies, 0.5), "p95":percentile(self.latencies, 0.95), "max":self.max_latency}}
+
+def percentile(samples, fraction):
+    if len(samples) == 0:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+# Singleton record of what the WorkQueue and work_tick have been doing
+# Jobs are always counted, timings are only kept while the metrics panel is open, so closing it makes this close to free
+class WorkMetrics:
+    samples = 256           # Timings kept per job type, for the percentiles
+    active_for = 5.0        # Seconds timings keep being recorded after the panel was last drawn
+    job_types = {}
+    viewed_at = None
+    ticks = 0
+    overruns = 0
+    max_overrun = 0.0
+    queue_depth = 0
+    max_queue_depth = 0
+    startup = []            # (phase, elapsed, busy, slices) of the last file load
+
+    @property
+    def active(self):
+        return WorkMetrics.viewed_at is not None and time.perf_counter() - WorkMetrics.viewed_at < WorkMetrics.active_for
+
+    def viewed(self):
+        WorkMetrics.viewed_at = time.perf_counter()
+
+    def job_type(self, type):
+        if type not in WorkMetrics.job_types:
+            WorkMetrics.job_types[type] = JobTypeMetrics()
+        return WorkMetrics.job_types[type]
+
+    # duration is None when timings aren't being recorded
+    def job_done(self, job, duration):
+        metrics = self.job_type(job.type)
+        metrics.count += 1
+        if duration is None:
+            return
+        latency = time.perf_counter() - job.enqueued_at
+        metrics.durations.append(duration)
+        metrics.latencies.append(latency)
+        metrics.max_duration = max(metrics.max_duration, duration)
+        metrics.max_latency = max(metrics.max_latency, latency)
+
+    def tick_done(self, elapsed, time_slice, queue_depth):
+        WorkMetrics.ticks += 1
+        WorkMetrics.queue_depth = queue_depth
+        WorkMetrics.max_queue_depth = max(WorkMetrics.max_queue_depth, queue_depth)
+        if elapsed > time_slice:
+            WorkMetrics.overruns += 1
+            WorkMetrics.max_overrun = max(WorkMetrics.max_overrun, elapsed - time_slice)
+
+    def startup_began(self):
+        WorkMetrics.startup = []
+
+    # elapsed is from the start of the phase to its end, busy only counts the time slices spent on it
+    def startup_phase_done(self, phase, elapsed, busy, slices):
+        WorkMetrics.startup.append((phase, elapsed, busy, slices))
+
+    def reset(self):
+        WorkMetrics.job_types = {}
+        WorkMetrics.ticks = 0
+        WorkMetrics.overruns = 0
+        WorkMetrics.max_overrun = 0.0
+        WorkMetrics.max_queue_depth = 0
+
+    @property
+    def json_data(self):
+        return {"ticks":WorkMetrics.ticks, "overruns":WorkMetrics.overruns, "max_overrun":WorkMetrics.max_overrun,
+            "queue_depth":WorkMetrics.queue_depth, "max_queue_depth":WorkMetrics.max_queue_depth,
+            "startup":[{"phase":phase, "elapsed":elapsed, "busy":busy, "slices":slices} for phase, elapsed, busy, slices in WorkMetrics.startup],
+            "job_types":{type:metrics.json_data for type, metrics in WorkMetrics.job_types.items()}}
+
+##############
+#   Tracer   #
+##############
+
+# Shared by every span while the tracer is off, so an untraced call costs one attribute check
+class NoSpan:
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        return False
+
+class Span:
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        Tracer().complete(self.name, self.category, self.start_time, time.perf_counter() - self.start_time, self.args)
+        return False
+
+# Singleton recorder of Chrome trace events, loadable in chrome://tracing or Perfetto
+# Events go into a ring buffer, so it can be left on for a long session and only keeps the most recent events
+class Tracer:
+    capacity = 200000
+    enabled = False
+    events = collections.deque(maxlen=capacity)
+    no_span = NoSpan()
+
+    def start(self):
+        Tracer.events.clear()
+        Tracer.enabled = True
+
+    def stop(self):
+        Tracer.enabled = False
+
+    def event(self, name, category, phase, timestamp, args=None, **fields):
+        event = {"name":name, "cat":category, "ph":phase, "ts":timestamp * 1000000, "pid":os.getpid(), "tid":threading.get_ident()}
+        if args:
+            event["args"] = args
+        event.update(fields)
+        Tracer.events.append(event)
+
+    # Complete events carry their own duration, so the ring buffer never drops one half of a begin/end pair
+    def complete(self, name, category, start_time, duration, args=None):
+        self.event(name, category, "X", start_time, args, dur=duration * 1000000)
+
+    def instant(self, name, category, args=None):
+        if Tracer.enabled:
+            self.event(name, category, "i", time.perf_counter(), args, s="t")
+
+    # with Tracer().span("work_tick", "scheduler"): ...
+    def span(self, name, category, args=None):
+        if not Tracer.enabled:
+            return Tracer.no_span
+        return Span(name, category, args)
+
+    @property
+    def json_data(self):
+        return {"traceEvents":list(Tracer.events), "displayTimeUnit":"ms"}
+
+# Decorator for property callbacks, so their time shows up in the trace
+# Blender checks how many arguments a callback takes, so the wrapper has to spell out the (self, value) or (self, context) pair
+def traced(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(self, argument):
+            if not Tracer.enabled:
+                return function(self, argument)
+            with Span(name, "property", None):
+                return function(self, argument)
+        return wrapper
+    return decorator
+
+#################
+#   Operators   #
+#################
+class SCG_CYCLER_OT_Dump_Work_Metrics(bpy.types.Operator, ExportHelper):
+    bl_idname = "scg_cycler.dump_work_metrics"
+    bl_label = "Dump Work Metrics"
+    bl_description = "Write the work queue metrics to a JSON file"
+
+    filename_ext = ".json"
+    filter_glob : bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def execute(self, context):
+        with open(self.filepath, "w") as f:
+            json.dump(WorkMetrics().json_data, f, indent=3)
+        return {"FINISHED"}
+
+class SCG_CYCLER_OT_Reset_Work_Metrics(bpy.types.Operator):
+    bl_idname = "scg_cycler.reset_work_metrics"
+    bl_label = "Reset Work Metrics"
+    bl_description = "Clear the work queue metrics"
+
+    def execute(self, context):
+        WorkMetrics().reset()
+        return {"FINISHED"}
+
+class SCG_CYCLER_OT_Toggle_Trace(bpy.types.Operator):
+    bl_idname = "scg_cycler.toggle_trace"
+    bl_label = "Toggle Trace"
+    bl_description = "Start or stop recording a timeline of cycler work, keeping the most recent events"
+
+    def execute(self, context):
+        if Tracer.enabled:
+            Tracer().stop()
+        else:
+            Tracer().start()
+        return {"FINISHED"}
+
+class SCG_CYCLER_OT_Save_Trace(bpy.types.Operator, ExportHelper):
+    bl_idname = "scg_cycler.save_trace"
+    bl_label = "Save Trace"
+    bl_description = "Write the recorded timeline as Chrome trace events, for chrome://tracing or Perfetto"
+
+    filename_ext = ".json"
+    filter_glob : bpy.props.StringProperty(default="*.json", options={"HIDDEN"})
+
+    def execute(self, context):
+        with open(self.filepath, "w") as f:
+            json.dump(Tracer().json_data, f)
+        return {"FINISHED"}
+
+######################
+#   User Interface   #
+######################
+class SCG_CYCLER_PT_Work_Metrics_Panel(bpy.types.Panel, Context_Interface):
+    bl_idname = "SCG_CYCLER_PT_Work_Metrics_Panel"
+    bl_label = "Work Metrics"
+    bl_category = "SCG Cycler"
+    bl_space_type = "VIEW_3D"
+    bl_region_type = "UI"
+    bl_parent_id = "SCG_CYCLER_PT_Context_Panel"
+    bl_options = {"DEFAULT_CLOSED"}
+
+    def draw(self, context):
+        metrics = WorkMetrics()
+        metrics.viewed()
+        row = self.layout.row()
+        row.operator("scg_cycler.dump_work_metrics")
+        row.operator("scg_cycler.reset_work_metrics")
+        row = self.layout.row()
+        row.operator("scg_cycler.toggle_trace", text="Stop Trace" if Tracer.enabled else "Start Trace", depress=Tracer.enabled)
+        row.operator("scg_cycler.save_trace")
+        row.label(text="{0} events".format(len(Tracer.events)))
+        self.layout.row().label(text="Queue Depth: {0} (max {1})".format(WorkMetrics.queue_depth, WorkMetrics.max_queue_depth))
+        self.layout.row().label(text="Ticks: {0}, Overruns: {1} (max {2:.1f} ms)".format(WorkMetrics.ticks, WorkMetrics.overruns, WorkMetrics.max_overrun * 1000))
+
+        if len(WorkMetrics.startup) > 0:
+            box = self.layout.box()
+            row = box.row()
+            for heading in ("Startup", "Elapsed", "Busy", "Slices"):
+                row.label(text=heading)
+            for phase, elapsed, busy, slices in WorkMetrics.startup:
+                row = box.row()
+                row.label(text=phase)
+                row.label(text="{0:.1f} ms".format(elapsed * 1000))
+                row.label(text="{0:.1f} ms".format(busy * 1000))
+                row.label(text=str(slices))
+
+        box = self.layout.box()
+        row = box.row()
+        for heading in ("Job", "Count", "p50", "p95", "Max", "Latency p50"):
+            row.label(text=heading)
+        for type, job_metrics in sorted(WorkMetrics.job_types.items()):
+            row = box.row()
+            row.label(text=type)
+            row.label(text=str(job_metrics.count))
+            row.label(text="{0:.2f} ms".format(percentile(job_metrics.durations, 0.5) * 1000))
+            row.label(text="{0:.2f} ms".format(percentile(job_metrics.durations, 0.95) * 1000))
+            row.label(text="{0:.2f} ms".format(job_metrics.max_duration * 1000))
+            row.label(text="{0:.2f} ms".format(percentile(job_metrics.latencies, 0.5) * 1000))
+
+###############################
+#   Register and Unregister   #
+###############################
+classes = (SCG_CYCLER_OT_Dump_Work_Metrics, SCG_CYCLER_OT_Reset_Work_Metrics, SCG_CYCLER_OT_Toggle_Trace, SCG_CYCLER_OT_Save_Trace, SCG_CYCLER_PT_Work_Metrics_Panel)
+
+def register():
+    from bpy.utils import register_class
+    for cls in classes:
+        register_class(cls)
+
+def unregister():
+    Tracer().stop()
+    from bpy.utils import unregister_class
+    for cls in reversed(classes):
+        unregister_class(cls)
@@ -1,11 +1,27 @@
 import bpy
 
+from .constants import CONTROL_UI_DEFAULT
+
+# The per control and per channel panels are only registered when the preferences ask for them,
+# otherwise controls are drawn in a list, see SCG_CYCLER_UL_Controls
+def panels_enabled():
+    addon = bpy.context.preferences.addons.get(__package__)
+    control_ui = addon.preferences.control_ui if addon is not None else CONTROL_UI_DEFAULT
+    return control_ui == "PANELS"
+
+# Registry of the dynamically created panels, keyed by their bl_idname
+# Panels can be registered under a group, so everything belonging to one control can be removed without looking at the rest
 class Panel_Factory:
     def __init__(self):
         self.panels = {}
+        self.groups = {}        # group -> {panel id: None}, in registration order so parents come before their children
+        self.panel_groups = {}  # panel id -> group
     
-    def register_new_panel(self, id, cls):
+    def register_new_panel(self, id, cls, group=None):
         self.panels[id]=cls
+        if group is not None:
+            self.groups.setdefault(group, {})[id] = None
+            self.panel_groups[id] = group
         from bpy.utils import register_class
         register_class(cls)
 
@@ -13,13 +29,24 @@ class Panel_Factory:
         from bpy.utils import unregister_class
         unregister_class(self.panels[id])
         del self.panels[id]
+        group = self.panel_groups.pop(id, None)
+        if group is not None:
+            del self.groups[group][id]
+            if len(self.groups[group]) == 0:
+                del self.groups[group]
+
+    # Children are unregistered before their parents
+    def remove_group(self, group):
+        for panel_id in reversed(list(self.groups.get(group, ()))):
+            self.remove_panel(panel_id)
 
     def remove_all_panels(self):
         from bpy.utils import unregister_class
-        for panel_id, cls in self.panels.items():
+        for panel_id, cls in reversed(list(self.panels.items())):
             unregister_class(cls)
-        del self.panels
         self.panels = {}
+        self.groups = {}
+        self.panel_groups = {}
 
 class Children_Have_Panels:
     panel_factory = Panel_Factory()
@@ -35,8 +62,9 @@ class Children_Have_Panels:
                 self.panel_factory.register_new_panel(panel_id, new_class)
 
     def remove_panels(self):
-        panels_to_remove = [panel_id for panel_id in self.panel_factory.panels if panel_id not in self.panel_ids]
-        for panel_id in panels_to_remove:
+        panel_ids = set(self.panel_ids)
+        panels_to_remove = [panel_id for panel_id in self.panel_factory.panels if panel_id not in panel_ids]
+        for panel_id in reversed(panels_to_remove):
             self.panel_factory.remove_panel(panel_id)
 
     def create_panel_class(self, **kwargs):
@@ -0,0 +1,263 @@
+import numpy as np
+
+# Plans the keyframes each channel's fcurve should end up with, from plain arrays
+# Nothing in here touches bpy, so it can be tested and benchmarked outside of Blender
+
+# Keyframe properties that get copied along with the value and handles
+ENUM_ATTRIBUTES = ("handle_left_type", "handle_right_type", "interpolation", "easing", "type")
+FLOAT_ATTRIBUTES = ("amplitude", "back", "period")
+ATTRIBUTES = ENUM_ATTRIBUTES + FLOAT_ATTRIBUTES
+
+# Blender's values for the "AUTO" and "AUTO_CLAMPED" handle types, whose handles it works out again on every update
+AUTO_HANDLE_TYPES = (1, 4)
+
+# Row kinds
+ENSURE = 0  # The frame needs a keyframe, anything already there is left alone
+COPY = 1    # The frame gets a copy of a source keyframe, or of the default value the source is about to be inserted with
+
+# Orders rows so the last write to a frame wins, the same way the jobs used to queue them
+LAST_ORDER = 1 << 30
+
+#######################
+#   Keyframe Arrays   #
+#######################
+
+# The keyframe points of one fcurve, as flat arrays
+class KeyframeArrays:
+    def __init__(self, frames, values, handle_left, handle_right, attributes):
+        self.frames = np.asarray(frames, dtype=np.float64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.handle_left = np.asarray(handle_left, dtype=np.float64).reshape(-1, 2)
+        self.handle_right = np.asarray(handle_right, dtype=np.float64).reshape(-1, 2)
+        self.attributes = {}
+        for name in ENUM_ATTRIBUTES:
+            self.attributes[name] = np.asarray(attributes[name], dtype=np.int64) if name in attributes else np.zeros(len(self.frames), dtype=np.int64)
+        for name in FLOAT_ATTRIBUTES:
+            self.attributes[name] = np.asarray(attributes[name], dtype=np.float64) if name in attributes else np.zeros(len(self.frames), dtype=np.float64)
+
+    def __len__(self):
+        return len(self.frames)
+
+    @classmethod
+    def empty(cls):
+        return cls.blank(0)
+
+    @classmethod
+    def blank(cls, count):
+        return cls(np.zeros(count), np.zeros(count), np.zeros((count, 2)), np.zeros((count, 2)), {})
+
+    @classmethod
+    def concatenate(cls, arrays):
+        attributes = {name:np.concatenate([keyframes.attributes[name] for keyframes in arrays]) for name in ATTRIBUTES}
+        return cls(np.concatenate([keyframes.frames for keyframes in arrays]),
+            np.concatenate([keyframes.values for keyframes in arrays]),
+            np.concatenate([keyframes.handle_left for keyframes in arrays]),
+            np.concatenate([keyframes.handle_right for keyframes in arrays]),
+            attributes)
+
+####################
+#   Channel Plan   #
+####################
+
+# Everything the planner needs to know about one channel
+# marker_frames and offsets come from the channel's keyframes, in order, and the mirror ones from the mirror channel's
+class ChannelPlan:
+    def __init__(self, key, fcurve, marker_frames, offsets, inverted, default_value=0.0, mirrored=False, mirror_fcurve=None, mirror_marker_frames=(), mirror_offsets=(), mirror_invert=False):
+        self.key = key
+        self.fcurve = fcurve
+        self.marker_frames = np.asarray(marker_frames, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+        self.inverted = np.asarray(inverted, dtype=bool)
+        self.default_value = default_value
+        self.mirrored = mirrored
+        self.mirror_fcurve = mirror_fcurve if mirror_fcurve is not None else KeyframeArrays.empty()
+        self.mirror_marker_frames = np.asarray(mirror_marker_frames, dtype=np.float64) if mirrored else np.zeros(0)
+        self.mirror_offsets = np.asarray(mirror_offsets, dtype=np.float64) if mirrored else np.zeros(0)
+        self.mirror_invert = mirror_invert
+
+#####################
+#   Keyframe Diff   #
+#####################
+
+# What has to change on one channel's fcurve
+# inserts are keyframes written as if freshly inserted, changes are full copies onto a frame
+class KeyframeDiff:
+    def __init__(self, key, removes, insert_frames, insert_values, change_frames, change_values, change_handle_left, change_handle_right, change_attributes):
+        self.key = key
+        self.removes = removes
+        self.insert_frames = insert_frames
+        self.insert_values = insert_values
+        self.change_frames = change_frames
+        self.change_values = change_values
+        self.change_handle_left = change_handle_left
+        self.change_handle_right = change_handle_right
+        self.change_attributes = change_attributes
+
+    @property
+    def is_empty(self):
+        return len(self.removes) == 0 and len(self.insert_frames) == 0 and len(self.change_frames) == 0
+
+###############
+#   Planner   #
+###############
+
+# Turns (curve, frame) pairs into single sortable keys, frames are offset so every curve gets its own span
+def curve_frame_keys(curves, frames, base, span):
+    return curves * span + (frames - base)
+
+# Returns the index of each key in sorted_keys, or -1 where it is missing
+def lookup(sorted_keys, order, keys):
+    if len(sorted_keys) == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+    positions = np.searchsorted(sorted_keys, keys, side="right") - 1
+    positions = np.clip(positions, 0, len(sorted_keys) - 1)
+    found = sorted_keys[positions] == keys
+    return np.where(found, order[positions], -1)
+
+def plan(channels, anim_length):
+    count = len(channels)
+    if count == 0:
+        return []
+    half_point = anim_length / 2
+
+    # Own fcurves are curves 0..count-1, mirror fcurves are count..2*count-1
+    curves = [channel.fcurve for channel in channels] + [channel.mirror_fcurve for channel in channels]
+    curve_ids = np.repeat(np.arange(2 * count), [len(curve) for curve in curves])
+    # Missing lookups point at a blank keyframe on the end, so they can still be indexed
+    padded = KeyframeArrays.concatenate(curves + [KeyframeArrays.blank(1)])
+    blank_index = len(padded) - 1
+    existing_frames = padded.frames[:blank_index]
+
+    # Schedule of the channels' own keyframes
+    own_lengths = np.array([len(channel.marker_frames) for channel in channels], dtype=np.int64)
+    own_channel = np.repeat(np.arange(count), own_lengths)
+    own_position = np.arange(len(own_channel)) - np.repeat(np.cumsum(own_lengths) - own_lengths, own_lengths)
+    own_frames = np.round(np.concatenate([channel.marker_frames for channel in channels]) + (np.concatenate([channel.offsets for channel in channels]) / 100) * anim_length)
+    own_inverted = np.concatenate([channel.inverted for channel in channels])
+
+    # Schedule of the mirror channels' keyframes
+    mirror_lengths = np.array([len(channel.mirror_marker_frames) for channel in channels], dtype=np.int64)
+    mirror_channel = np.repeat(np.arange(count), mirror_lengths)
+    mirror_position = np.arange(len(mirror_channel)) - np.repeat(np.cumsum(mirror_lengths) - mirror_lengths, mirror_lengths)
+    mirror_frames = np.round(np.concatenate([channel.mirror_marker_frames for channel in channels]) + (np.concatenate([channel.mirror_offsets for channel in channels]) / 100) * anim_length)
+
+    mirrored = np.array([channel.mirrored for channel in channels], dtype=bool)
+    mirror_invert = np.array([channel.mirror_invert for channel in channels], dtype=bool)
+    default_values = np.array([channel.default_value for channel in channels], dtype=np.float64)
+
+    # Every channel keeps its own keyframes
+    rows = [(own_channel, own_frames, np.full(len(own_channel), ENSURE), np.full(len(own_channel), -1), own_frames, np.zeros(len(own_channel)), np.ones(len(own_channel)), own_position * 2)]
+
+    # Unmirrored channels copy their keyframes to the half point, inverting if asked
+    half = ~mirrored[own_channel]
+    rows.append((own_channel[half], np.round(own_frames[half] + half_point), np.full(half.sum(), COPY), own_channel[half], own_frames[half],
+        np.full(half.sum(), half_point), np.where(own_inverted[half], -1.0, 1.0), own_position[half] * 2 + 1))
+
+    # Mirrored channels copy the mirror channel's keyframes to the half point
+    mirror = mirrored[mirror_channel]
+    rows.append((mirror_channel[mirror], np.round(mirror_frames[mirror] + half_point), np.full(mirror.sum(), COPY), mirror_channel[mirror] + count, mirror_frames[mirror],
+        np.full(mirror.sum(), half_point), np.where(mirror_invert[mirror_channel[mirror]], -1.0, 1.0), own_lengths[mirror_channel[mirror]] * 2 + mirror_position[mirror]))
+
+    # The first keyframe gets copied to the end, so the cycle loops
+    first = own_position == 0
+    rows.append((own_channel[first], np.round(own_frames[first] + anim_length), np.full(first.sum(), COPY), own_channel[first], own_frames[first],
+        np.full(first.sum(), float(anim_length)), np.ones(first.sum()), np.full(first.sum(), LAST_ORDER)))
+
+    row_channel, row_target, row_kind, row_source_curve, row_source_frame, row_shift, row_sign, row_order = (np.concatenate(column) for column in zip(*rows))
+    row_channel = row_channel.astype(np.int64)
+    row_source_curve = row_source_curve.astype(np.int64)
+
+    # Keys for looking frames up across all curves at once
+    all_frames = np.concatenate([existing_frames, row_target, row_source_frame])
+    base = all_frames.min() - 1.0 if len(all_frames) > 0 else 0.0
+    span = (all_frames.max() - base + 2.0) if len(all_frames) > 0 else 1.0
+    existing_keys = curve_frame_keys(curve_ids, existing_frames, base, span)
+    existing_order = np.argsort(existing_keys, kind="stable")
+    sorted_keys = existing_keys[existing_order]
+
+    target_keys = curve_frame_keys(row_channel, row_target, base, span)
+    target_index = lookup(sorted_keys, existing_order, target_keys)
+    source_index = np.where(row_kind == COPY, lookup(sorted_keys, existing_order, curve_frame_keys(row_source_curve, row_source_frame, base, span)), -1)
+    target_exists = target_index >= 0
+    safe_target = np.where(target_exists, target_index, blank_index)
+    has_source = source_index >= 0
+    safe_source = np.where(has_source, source_index, blank_index)
+
+    # Rows that copy a real keyframe
+    copy = (row_kind == COPY) & has_source
+    # Rows that fall back to the default value, either a missing own keyframe or a copy with no source
+    # A missing source is inserted with the default value in this same plan, so its copies get that value with their sign
+    insert = ((row_kind == ENSURE) & ~target_exists) | ((row_kind == COPY) & ~has_source)
+    insert_values = default_values[row_channel] * row_sign
+
+    copy_values = padded.values[safe_source] * row_sign
+    copy_handle_left = np.stack([np.round(padded.handle_left[safe_source, 0] + row_shift), padded.handle_left[safe_source, 1] * row_sign], axis=1)
+    copy_handle_right = np.stack([np.round(padded.handle_right[safe_source, 0] + row_shift), padded.handle_right[safe_source, 1] * row_sign], axis=1)
+
+    # The last write to a frame wins, decided before dropping no-op writes so a no-op can't hand the frame to an earlier write
+    write = copy | insert
+    write_rows = np.nonzero(write)[0]
+    write_rows = write_rows[np.lexsort((row_order[write_rows], target_keys[write_rows]))]
+    if len(write_rows) > 0:
+        last = np.append(target_keys[write_rows][1:] != target_keys[write_rows][:-1], True)
+        write_rows = write_rows[last]
+
+    # Skip writes that wouldn't change anything
+    # Auto handles never end up where the copy puts them, Blender moves them again, so only their type is compared
+    left_matches = np.all(padded.handle_left[safe_target] == copy_handle_left, axis=1) | np.isin(padded.attributes["handle_left_type"][safe_source], AUTO_HANDLE_TYPES)
+    right_matches = np.all(padded.handle_right[safe_target] == copy_handle_right, axis=1) | np.isin(padded.attributes["handle_right_type"][safe_source], AUTO_HANDLE_TYPES)
+    matches = (padded.values[safe_target] == copy_values) & left_matches & right_matches
+    for name in ATTRIBUTES:
+        matches &= padded.attributes[name][safe_target] == padded.attributes[name][safe_source]
+    copy &= ~(target_exists & matches)
+    insert &= ~(target_exists & (padded.values[safe_target] == insert_values))
+    write_rows = write_rows[(copy | insert)[write_rows]]
+    copy_rows = write_rows[copy[write_rows]]
+    insert_rows = write_rows[insert[write_rows]]
+
+    # Anything on a channel's own fcurve that isn't expected gets removed
+    own_existing = curve_ids < count
+    removes = own_existing & ~np.isin(existing_keys, target_keys)
+    remove_rows = np.nonzero(removes)[0]
+
+    # Split everything back out per channel
+    diffs = []
+    remove_bounds = np.searchsorted(curve_ids[remove_rows], np.arange(count + 1))
+    copy_rows = copy_rows[np.argsort(row_channel[copy_rows], kind="stable")]
+    copy_bounds = np.searchsorted(row_channel[copy_rows], np.arange(count + 1))
+    insert_rows = insert_rows[np.argsort(row_channel[insert_rows], kind="stable")]
+    insert_bounds = np.searchsorted(row_channel[insert_rows], np.arange(count + 1))
+    for index, channel in enumerate(channels):
+        channel_removes = remove_rows[remove_bounds[index]:remove_bounds[index + 1]]
+        channel_copies = copy_rows[copy_bounds[index]:copy_bounds[index + 1]]
+        channel_inserts = insert_rows[insert_bounds[index]:insert_bounds[index + 1]]
+        diffs.append(KeyframeDiff(channel.key,
+            existing_frames[channel_removes],
+            row_target[channel_inserts], insert_values[channel_inserts],
+            row_target[channel_copies], copy_values[channel_copies], copy_handle_left[channel_copies], copy_handle_right[channel_copies],
+            {name:padded.attributes[name][safe_source[channel_copies]] for name in ATTRIBUTES}))
+    return diffs
+
+##############
+#   Remap    #
+##############
+
+# Works out where every keyframe point of an fcurve goes when the animation is resized
+# frames are the points' current frames, old_frames and new_frames the map from the cycler's keyframes
+# Returns each point's new frame and whether it is kept. Points within tolerance of an old frame go to its new frame,
+# the rest are dropped, so nothing is left behind on a frame another point moves onto
+def remap_frames(frames, old_frames, new_frames, tolerance):
+    frames = np.asarray(frames, dtype=np.float64)
+    old_frames = np.asarray(old_frames, dtype=np.float64)
+    new_frames = np.asarray(new_frames, dtype=np.float64)
+    if len(frames) == 0 or len(old_frames) == 0:
+        return frames.copy(), np.zeros(len(frames), dtype=bool)
+    order = np.argsort(old_frames, kind="stable")
+    sorted_old = old_frames[order]
+
+    # Closest old frame to each point
+    right = np.clip(np.searchsorted(sorted_old, frames), 0, len(sorted_old) - 1)
+    left = np.clip(right - 1, 0, len(sorted_old) - 1)
+    closest = np.where(np.abs(frames - sorted_old[left]) <= np.abs(frames - sorted_old[right]), left, right)
+    mapped = np.abs(frames - sorted_old[closest]) <= tolerance
+    return np.where(mapped, new_frames[order][closest], frames), mapped
@@ -5,10 +5,14 @@ from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
 from .controls import SCG_Cycler_Controls
 from .bone import SCG_Cycler_Rig_Bones
 from .timings import SCG_Cycler_Timing
+from .fcurve_index import FCurveIndex
+from .work import WorkQueue, DirtyTracker, BulkLoad, UpdateMarkerLengthJob
+from .interfaces import SCG_Cycler_Indexed_Collection as Indexed_Collection
 
 class SCG_Cycler_Rig_Action(bpy.types.PropertyGroup, Context_Interface):
     name : bpy.props.StringProperty(name="Name")
     def action_update(self, context):
+        FCurveIndex().invalidate()
         self.name = "{0}:{1}".format(self.action.name if not self.action is None else "", self.armature.name if not self.armature is None else "")
         self.cycler.rig_actions.current_rig_action_name = self.name
 
@@ -29,13 +33,39 @@ class SCG_Cycler_Rig_Action(bpy.types.PropertyGroup, Context_Interface):
     def json_data(self):
         return {"controls":self.controls.json_data, "timings":self.timings.json_data}
 
+    # The whole tree is built with the per item callbacks held back, then laid out, given panels and auto updated once
+    # Timings go first, so the keyframes' markers have frame markers to refer to
+    # The loaded keyframes are written fresh by the auto update, so the scene takes the new timings without resizing anything
     def load_from_json_data(self, json_data):
-        self.controls.load_from_json_data(json_data["controls"])
-        self.timings.load_from_json_data(json_data["timings"])
+        with BulkLoad():
+            self.timings.load_from_json_data(json_data["timings"])
+            self.controls.load_from_json_data(json_data["controls"])
+        Indexed_Collection.invalidate_indexes()
+        if self.cycler.rig_actions.selected_rig_action == self:
+            fps = int(self.timings.fps_mode)
+            bpy.context.scene.render.fps = fps
+            bpy.context.scene.frame_start = 0
+            bpy.context.scene.frame_end = round(self.timings.animation_length * fps)
+        self.cycler.update_ui()
+        WorkQueue().add(UpdateMarkerLengthJob())
+        DirtyTracker().mark_all(self.name)
+
+    # Length of the animation in frames
+    # The scene's frame range belongs to the selected rig action, the others go by their own timings
+    @property
+    def num_frames(self):
+        if self.cycler.rig_actions.selected_rig_action == self:
+            return bpy.context.scene.frame_end
+        return round(self.timings.animation_length * int(self.timings.fps_mode))
 
+    # The template's body is only read now, see SCG_Cycler_Animation_Template
+    # False if the template couldn't be read, nothing is changed then
     def update_from_animation_template(self, animation_template):
-        self.timings.load_from_json_data(animation_template.timings.json_data)
-        self.controls.load_from_json_data(animation_template.controls.json_data)
+        json_data = animation_template.json_data
+        if json_data is None:
+            return False
+        self.load_from_json_data(json_data)
+        return True
 
 class SCG_Cycler_Rig_Actions(bpy.types.PropertyGroup):
     def current_rig_action_name_changed(self, context):
@@ -47,17 +77,30 @@ class SCG_Cycler_Rig_Actions(bpy.types.PropertyGroup):
     rig_actions : bpy.props.CollectionProperty(type=SCG_Cycler_Rig_Action)
 
     @property
-    def rig_action(self):
+    def selected_rig_action(self):
         if len(self.rig_actions) == 0 or self.current_rig_action > len(self.rig_actions)-1:
             return None
         return self.rig_actions[self.current_rig_action]
+
+    # The rig action being worked on, which is the selected one unless a job for another rig action is running
+    @property
+    def rig_action(self):
+        if WorkQueue.rig_action is not None:
+            return WorkQueue.rig_action
+        return self.selected_rig_action
+
+    def find(self, name):
+        for rig_action in self.rig_actions:
+            if rig_action.name == name:
+                return rig_action
+        return None
     
     def update_ui(self):
-        if not self.rig_action is None:
+        if not self.selected_rig_action is None:
             # Remove invalid panels
-            self.rig_action.controls.remove_panels()
+            self.selected_rig_action.controls.remove_panels()
             # Add missing panels
-            self.rig_action.controls.add_panels()
+            self.selected_rig_action.controls.add_panels()
 
 #################
 #   Operators   #
@@ -0,0 +1,94 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import subprocess
+import concurrent.futures
+
+# Re-applies the cycler to many .blend files, one background Blender per file, several at a time
+#   python scripts/batch_cycle.py animations/*.blend --blender /path/to/blender --jobs 8 --report report.json
+
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULT_PREFIX = "SCG_CYCLER_RESULT " # Same as headless.RESULT_PREFIX, headless.py can't be imported outside of Blender
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Re-apply the cycler to .blend files in parallel")
+    parser.add_argument("files", nargs="+", help=".blend files or glob patterns")
+    parser.add_argument("--blender", default="blender", help="Blender executable")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Blender processes to run at once")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a file is given up on")
+    parser.add_argument("--max-jobs", type=int, default=1000000, help="Cycler jobs before a file is given up on")
+    parser.add_argument("--no-save", action="store_true", help="Leave the files as they are on disk")
+    parser.add_argument("--report", default=None, help="Write the summary to this JSON file")
+    return parser.parse_args()
+
+def blend_files(patterns):
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(path for path in matches if path not in files)
+    return files
+
+def command(arguments, path):
+    # Import the addon from the folder this script lives in, whether or not it is installed
+    expression = "import sys; sys.path.insert(0, {0!r}); import {1}.headless; {1}.headless.main()".format(
+        os.path.dirname(addon_directory), os.path.basename(addon_directory))
+    script_arguments = ["--max-jobs", str(arguments.max_jobs)] + (["--no-save"] if arguments.no_save else [])
+    return [arguments.blender, "-b", path, "--python-exit-code", "1", "--python-expr", expression, "--"] + script_arguments
+
+# Runs in a worker thread, the work itself happens in the Blender process it starts
+def process_file(arguments, path):
+    report = {"file":path, "status":"failed", "wall_time":0.0, "result":None, "error":None}
+    start_time = time.perf_counter()
+    try:
+        completed = subprocess.run(command(arguments, path), capture_output=True, text=True, timeout=arguments.timeout)
+    except subprocess.TimeoutExpired:
+        report["status"] = "timeout"
+        report["wall_time"] = time.perf_counter() - start_time
+        return report
+    report["wall_time"] = time.perf_counter() - start_time
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            report["result"] = json.loads(line[len(RESULT_PREFIX):])
+    if completed.returncode == 0 and report["result"] is not None:
+        report["status"] = "ok"
+    else:
+        report["error"] = (completed.stderr or completed.stdout).strip().splitlines()[-20:]
+    return report
+
+def summarise(reports, wall_time):
+    statuses = {}
+    for report in reports:
+        statuses[report["status"]] = statuses.get(report["status"], 0) + 1
+    return {"files":len(reports), "statuses":statuses, "wall_time":wall_time,
+        "cycle_time":sum(report["result"]["cycle_time"] for report in reports if report["result"] is not None),
+        "reports":reports}
+
+def print_summary(summary):
+    for report in summary["reports"]:
+        result = report["result"] or {}
+        print("{0:<8} {1:>8.2f}s {2:>8.2f}s {3:>8} jobs  {4}".format(report["status"], report["wall_time"],
+            result.get("cycle_time", 0.0), result.get("jobs", "-"), report["file"]))
+        for line in report["error"] or []:
+            print("         " + line)
+    print("{0} files in {1:.2f}s: {2}".format(summary["files"], summary["wall_time"],
+        ", ".join("{0} {1}".format(count, status) for status, count in sorted(summary["statuses"].items()))))
+
+def main():
+    arguments = parse_arguments()
+    files = blend_files(arguments.files)
+    start_time = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, arguments.jobs)) as executor:
+        reports = list(executor.map(lambda path: process_file(arguments, path), files))
+    summary = summarise(reports, time.perf_counter() - start_time)
+    print_summary(summary)
+    if arguments.report is not None:
+        with open(arguments.report, "w") as f:
+            json.dump(summary, f, indent=3)
+    if summary["statuses"].get("ok", 0) != len(files):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import argparse
+import importlib.util
+
+# Converts template and whitelist library files between .json and the binary .scgl format, whichever way they are
+#   python scripts/convert_library.py templates/*.json
+#   python scripts/convert_library.py templates/*.scgl --output-directory exported
+
+# library_format.py doesn't need bpy, but the addon package does, so it is loaded on its own
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location("library_format", os.path.join(addon_directory, "library_format.py"))
+library_format = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(library_format)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Convert library files between .json and " + library_format.EXTENSION)
+    parser.add_argument("files", nargs="+", help=".json or " + library_format.EXTENSION + " files")
+    parser.add_argument("--output-directory", default=None, help="Write the converted files here instead of next to the originals")
+    parser.add_argument("--no-check", action="store_true", help="Skip reading the converted file back to compare it")
+    return parser.parse_args()
+
+def output_path(arguments, path, extension):
+    directory = arguments.output_directory or os.path.dirname(path)
+    return os.path.join(directory, os.path.splitext(os.path.basename(path))[0] + extension)
+
+def convert(arguments, path):
+    if library_format.is_library_file(path):
+        data = library_format.read(path)
+        converted = output_path(arguments, path, ".json")
+        with open(converted, "w") as f:
+            json.dump(data, f, indent=3)
+    else:
+        with open(path) as f:
+            data = json.load(f)
+        converted = output_path(arguments, path, library_format.EXTENSION)
+        library_format.write(converted, data)
+    if not arguments.no_check:
+        if library_format.is_library_file(converted):
+            read_back = library_format.read(converted)
+        else:
+            with open(converted) as f:
+                read_back = json.load(f)
+        # Compared as JSON so key order and int/float differences count
+        if json.dumps(read_back) != json.dumps(data):
+            raise library_format.LibraryFormatError("{0} doesn't read back the same as {1}".format(converted, path))
+    return converted
+
+def main():
+    arguments = parse_arguments()
+    if arguments.output_directory is not None:
+        os.makedirs(arguments.output_directory, exist_ok=True)
+    failed = False
+    for path in arguments.files:
+        try:
+            converted = convert(arguments, path)
+        except (OSError, ValueError) as error:
+            print("failed   {0}: {1}".format(path, error))
+            failed = True
+            continue
+        print("{0:>8} {1} -> {2} ({3} bytes)".format(os.path.getsize(path), path, converted, os.path.getsize(converted)))
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
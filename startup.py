@@ -0,0 +1,129 @@
+import bpy
+import time
+
+from .work import work_tick, Scheduler, DirtyTracker
+from .fcurve_index import FCurveIndex, FrameIndex
+from .interfaces import SCG_Cycler_Indexed_Collection
+from .metrics import WorkMetrics, Tracer
+
+###############
+#   Startup   #
+###############
+
+# This is called to make Startup do the next slice of its phases
+def startup_tick():
+    return Startup().tick()
+
+# Singleton that gets a freshly loaded file ready in phases, a time slice at a time, so the file is interactive straight away
+#   core            caches and subscriptions, done before load_post returns since everything else relies on them
+#   active panels   panels of the selected rig action's controls, a control at a time
+#   rest            fcurve indexes of every rig action, then the auto update is started
+class Startup:
+    steps = None            # Generator yielding after every step, with the name of the phase it is in
+    phase = None
+    phase_start = 0.0
+    phase_busy = 0.0
+    phase_slices = 0
+
+    def begin(self):
+        self.cancel()
+        WorkMetrics().startup_began()
+        start_time = time.perf_counter()
+        self.phase_began("core", start_time)
+        self.initialise_core()
+        self.phase_done(time.perf_counter(), start_time)
+        Startup.steps = self.phases()
+        bpy.app.timers.register(startup_tick)
+
+    def cancel(self):
+        if bpy.app.timers.is_registered(startup_tick):
+            bpy.app.timers.unregister(startup_tick)
+        Startup.steps = None
+        Startup.phase = None
+
+    @property
+    def running(self):
+        return Startup.steps is not None
+
+    def tick(self):
+        if Startup.steps is None:
+            return None
+        slice_start = time.perf_counter()
+        cutoff_time = slice_start + Scheduler().time_slice()
+        with Tracer().span("startup_tick", "startup"):
+            try:
+                while time.perf_counter() < cutoff_time:
+                    phase = next(Startup.steps)
+                    if phase != Startup.phase:
+                        now = time.perf_counter()
+                        self.phase_done(now, slice_start)
+                        self.phase_began(phase, now)
+                        slice_start = now
+            except StopIteration:
+                Startup.steps = None
+        if Startup.steps is None:
+            self.phase_done(time.perf_counter(), slice_start)
+            return None
+        Startup.phase_busy += time.perf_counter() - slice_start
+        Startup.phase_slices += 1
+        return 0.0
+
+    def phase_began(self, phase, now):
+        Startup.phase = phase
+        Startup.phase_start = now
+        Startup.phase_busy = 0.0
+        Startup.phase_slices = 0
+
+    # slice_start is when the phase's current slice began, the time since then is counted as busy
+    def phase_done(self, now, slice_start):
+        if Startup.phase is None:
+            return
+        busy = Startup.phase_busy + now - slice_start
+        WorkMetrics().startup_phase_done(Startup.phase, now - Startup.phase_start, busy, Startup.phase_slices + 1)
+        if Tracer.enabled:
+            Tracer().complete(Startup.phase, "startup", Startup.phase_start, now - Startup.phase_start)
+        Startup.phase = None
+
+    def initialise_core(self):
+        from . import subscribe_to_properties
+        subscribe_to_properties()
+        FCurveIndex().invalidate()
+        FrameIndex().invalidate()
+        SCG_Cycler_Indexed_Collection.invalidate_indexes()
+        DirtyTracker().mark_everything()
+        # Offsets can be edited as soon as the file is, so the selected rig action's keyframes can't wait for the rest phase
+        rig_action = bpy.context.scene.scg_cycler_context.rig_actions.selected_rig_action
+        if rig_action is not None:
+            self.update_keyframe_addresses(rig_action)
+
+    # Files saved before keyframes stored their channel don't have it yet
+    def update_keyframe_addresses(self, rig_action):
+        for control in rig_action.controls:
+            for channel in control:
+                channel.update_keyframe_addresses()
+
+    # Only the phase names are yielded, the cycler is looked up again after every yield as anything can happen in between
+    def phases(self):
+        yield "active panels"
+        rig_action = bpy.context.scene.scg_cycler_context.rig_actions.selected_rig_action
+        bone_names = []
+        if rig_action is not None:
+            rig_action.controls.remove_panels()
+            bone_names = [control.bone_name for control in rig_action.controls]
+        for bone_name in bone_names:
+            yield "active panels"
+            rig_action = bpy.context.scene.scg_cycler_context.rig_actions.selected_rig_action
+            control = rig_action.controls.get(bone_name) if rig_action is not None else None
+            if control is not None:
+                rig_action.controls.add_control_panels(control)
+
+        for name in [rig_action.name for rig_action in bpy.context.scene.scg_cycler_context.rig_actions.rig_actions]:
+            yield "rest"
+            rig_action = bpy.context.scene.scg_cycler_context.rig_actions.find(name)
+            if rig_action is not None:
+                self.update_keyframe_addresses(rig_action)
+            if rig_action is not None and rig_action.action is not None:
+                FCurveIndex().index(rig_action.action)
+        yield "rest"
+        if bpy.context.scene.scg_cycler_context.auto_update and not bpy.app.timers.is_registered(work_tick):
+            bpy.app.timers.register(work_tick)
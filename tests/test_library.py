@@ -0,0 +1,51 @@
+import os
+import sys
+import json
+import importlib
+
+import pytest
+
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEMPLATE = {"controls":[{"bone_name":"bone_{0}".format(index), "mirrored":False, "children":[]} for index in range(3)],
+    "timings":{"fps_mode":"24", "animation_length":2.0, "frame_markers":[{"name":"A", "length":50.0, "frame":0.0}, {"name":"B", "length":50.0, "frame":24.0}]}}
+
+@pytest.fixture
+def library_index(tmp_path, monkeypatch):
+    pytest.importorskip("bpy")
+    sys.path.insert(0, os.path.dirname(addon_directory))
+    try:
+        module = importlib.import_module(os.path.basename(addon_directory) + ".library_index")
+    finally:
+        sys.path.remove(os.path.dirname(addon_directory))
+    monkeypatch.setattr(module.LibraryIndex, "index_path", property(lambda self: str(tmp_path / "library_index.json")))
+    monkeypatch.setattr(module.LibraryIndex, "files", None)
+    return module.LibraryIndex()
+
+def test_index_keeps_headers_not_bodies(tmp_path, library_index):
+    library = tmp_path / "library"
+    library.mkdir()
+    (library / "templates.json").write_text(json.dumps({"templates":{"Walk":TEMPLATE}}))
+
+    sources = library_index.read([str(library)], "templates")
+    assert [headers for path, signature, headers in sources] == [{"Walk":{"marker_count":2, "control_count":3}}]
+    assert "bone_0" not in (tmp_path / "library_index.json").read_text()
+    assert library_index.entry(str(library / "templates.json"), "templates", "Walk") == TEMPLATE
+
+# Listing a binary library reads the table of contents, no entry body is decoded
+def test_binary_headers_come_from_the_contents(tmp_path, library_index, monkeypatch):
+    library_format = importlib.import_module(library_index.__module__.rsplit(".", 1)[0] + ".library_format")
+    library = tmp_path / "library"
+    library.mkdir()
+    data = {"templates":{"Walk":TEMPLATE, "Run":TEMPLATE}, "whitelists":{"Arms":["bone_0", "bone_1"]}}
+    path = str(library / ("templates" + library_format.EXTENSION))
+    library_format.write(path, data)
+    assert library_format.read(path) == data
+
+    def decode_body(*arguments):
+        raise AssertionError("an entry body was decoded")
+    monkeypatch.setattr(library_format.LibraryReader, "entry", decode_body)
+    monkeypatch.setattr(library_format.Decoder, "decode_table", decode_body)
+
+    sources = library_index.read([str(library)], "templates")
+    assert [headers for path, signature, headers in sources] == [{"Walk":{"marker_count":2, "control_count":3}, "Run":{"marker_count":2, "control_count":3}}]
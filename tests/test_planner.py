@@ -0,0 +1,66 @@
+import os
+import importlib.util
+
+# planner.py doesn't import bpy, but the addon package does, so load the module on its own
+spec = importlib.util.spec_from_file_location("planner", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "planner.py"))
+planner = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(planner)
+np = planner.np
+
+# An fcurve as {frame: value}, handles sit on the keyframe unless handle_shift moves them
+def keyframe_arrays(points, handle_shift=0.0, attributes=None):
+    frames = sorted(points)
+    values = [points[frame] for frame in frames]
+    handle_left = [(frame - handle_shift, points[frame] - handle_shift) for frame in frames]
+    handle_right = [(frame + handle_shift, points[frame] + handle_shift) for frame in frames]
+    return planner.KeyframeArrays(frames, values, handle_left, handle_right, {name:[value] * len(frames) for name, value in (attributes or {}).items()})
+
+# Does what the AutoUpdateJob's writers would do with a diff
+def apply(points, diff):
+    points = {frame:value for frame, value in points.items() if frame not in set(diff.removes.tolist())}
+    for frame, value in zip(diff.insert_frames.tolist(), diff.insert_values.tolist()):
+        points[frame] = value
+    for frame, value in zip(diff.change_frames.tolist(), diff.change_values.tolist()):
+        points[frame] = value
+    return points
+
+def test_colliding_copies_converge():
+    anim_length = 24
+    own = {0.0:1.0, 24.0:1.0}
+    mirror = {0.0:5.0, 12.0:7.0}
+    for _ in range(4):
+        channel = planner.ChannelPlan("channel", keyframe_arrays(own), [0.0], [0.0], [False], mirrored=True,
+            mirror_fcurve=keyframe_arrays(mirror), mirror_marker_frames=[0.0, 0.0], mirror_offsets=[0.0, 50.0])
+        diff = planner.plan([channel], anim_length)[0]
+        own = apply(own, diff)
+    # The loop copy of frame 0 is the last write to frame 24, whatever was there before
+    assert own[24.0] == 1.0
+    channel = planner.ChannelPlan("channel", keyframe_arrays(own), [0.0], [0.0], [False], mirrored=True,
+        mirror_fcurve=keyframe_arrays(mirror), mirror_marker_frames=[0.0, 0.0], mirror_offsets=[0.0, 50.0])
+    assert planner.plan([channel], anim_length)[0].is_empty
+
+def test_float_attributes_are_compared():
+    own = keyframe_arrays({0.0:1.0, 12.0:1.0, 24.0:1.0})
+    own.attributes["amplitude"][0] = 2.0
+    channel = planner.ChannelPlan("channel", own, [0.0], [0.0], [False])
+    diff = planner.plan([channel], 24)[0]
+    assert sorted(diff.change_frames.tolist()) == [12.0, 24.0]
+    assert np.all(diff.change_attributes["amplitude"] == 2.0)
+
+# The half point copy of a keyframe inserted in the same pass gets the inserted value, inverted
+def test_inverted_missing_keyframe_converges_in_one_pass():
+    channel = planner.ChannelPlan("channel", keyframe_arrays({}), [0.0], [0.0], [True], default_value=1.0)
+    own = apply({}, planner.plan([channel], 24)[0])
+    assert own == {0.0:1.0, 12.0:-1.0, 24.0:1.0}
+    channel = planner.ChannelPlan("channel", keyframe_arrays(own), [0.0], [0.0], [True], default_value=1.0)
+    assert planner.plan([channel], 24)[0].is_empty
+
+# Blender moves auto handles wherever it likes, so they can't tell a converged curve from one that needs writing
+def test_unchanged_auto_handles_are_left_alone():
+    for handle_type in planner.AUTO_HANDLE_TYPES:
+        own = keyframe_arrays({0.0:1.0, 12.0:1.0, 24.0:1.0}, handle_shift=3.67, attributes={"handle_left_type":handle_type, "handle_right_type":handle_type})
+        channel = planner.ChannelPlan("channel", own, [0.0], [0.0], [False])
+        assert planner.plan([channel], 24)[0].is_empty
+    own = keyframe_arrays({0.0:1.0, 12.0:1.0, 24.0:1.0}, handle_shift=3.67)
+    channel = planner.ChannelPlan("channel", own, [0.0], [0.0], [False])
+    assert sorted(planner.plan([channel], 24)[0].change_frames.tolist()) == [12.0, 24.0]
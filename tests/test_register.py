@@ -0,0 +1,48 @@
+import os
+import sys
+import inspect
+import importlib
+
+import pytest
+
+# Registering needs Blender's Python module, pip install bpy to run this outside of Blender
+bpy = pytest.importorskip("bpy")
+
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def addon():
+    sys.path.insert(0, os.path.dirname(addon_directory))
+    try:
+        yield importlib.import_module(os.path.basename(addon_directory))
+    finally:
+        sys.path.remove(os.path.dirname(addon_directory))
+
+def test_register_and_unregister(addon):
+    addon.register()
+    try:
+        assert hasattr(bpy.types.Scene, "scg_cycler_context")
+    finally:
+        addon.unregister()
+    assert not hasattr(bpy.types.Scene, "scg_cycler_context")
+
+# Blender refuses property callbacks that don't take exactly (self, value) or (self, context)
+def test_traced_callbacks_take_two_arguments(addon):
+    metrics = importlib.import_module(addon.__name__ + ".metrics")
+    callback = metrics.traced("callback")(lambda self, value: value)
+    assert callback.__code__.co_argcount == 2
+    assert callback(None, 5) == 5
+    metrics.Tracer().start()
+    try:
+        assert callback(None, 6) == 6
+    finally:
+        metrics.Tracer().stop()
+    assert len(inspect.signature(callback).parameters) == 2
+
+# Registered by a script rather than enabled, the controls are drawn the way a fresh install draws them
+def test_control_ui_without_preferences_matches_the_default(addon):
+    panel = importlib.import_module(addon.__name__ + ".panel")
+    addon_preferences = importlib.import_module(addon.__name__ + ".addon_preferences")
+    assert addon.__name__ not in bpy.context.preferences.addons
+    default = addon_preferences.SCG_Cycler_Addon_Preferences.__annotations__["control_ui"].keywords["default"]
+    assert panel.panels_enabled() == (default == "PANELS")
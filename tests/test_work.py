@@ -0,0 +1,129 @@
+import os
+import sys
+import random
+import importlib
+
+import pytest
+
+# The job queue needs Blender's Python module, pip install bpy to run this outside of Blender
+bpy = pytest.importorskip("bpy")
+
+addon_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def work():
+    sys.path.insert(0, os.path.dirname(addon_directory))
+    try:
+        addon = importlib.import_module(os.path.basename(addon_directory))
+    finally:
+        sys.path.remove(os.path.dirname(addon_directory))
+    addon.register()
+    work = importlib.import_module(addon.__name__ + ".work")
+    try:
+        yield work
+    finally:
+        for priority in work.WorkQueue.job_queues:
+            work.WorkQueue().cancel(priority)
+        work.DirtyTracker.states = {}
+        addon.unregister()
+
+# A user edit drops the background jobs, but only what they covered is planned again
+def test_cancelled_background_jobs_put_back_their_dirty_sets(work):
+    work.DirtyTracker().take("Walk")
+    auto_update = work.AutoUpdateJob(False, {"arm.L", "arm.R"}, {("leg.L", "LOCATION", "X")}, False)
+    auto_update.rig_action_name = "Walk"
+    work.WorkQueue().add(auto_update)
+    writer = work.Job("WRITE_KEYFRAMES")
+    writer.priority = work.PRIORITY_BACKGROUND
+    writer.rig_action_name = "Walk"
+    writer.channel_key = ("hand.L", "ROTATION_EULER", "Z")
+    work.WorkQueue().add(writer)
+
+    edit = work.Job("EDIT")
+    edit.priority = work.PRIORITY_USER
+    work.WorkQueue().add(edit)
+
+    assert work.WorkQueue().empty(work.PRIORITY_BACKGROUND)
+    state = work.DirtyTracker().state("Walk")
+    assert not state.all_dirty
+    assert state.controls == {"arm.L", "arm.R"}
+    assert state.channels == {("leg.L", "LOCATION", "X"), ("hand.L", "ROTATION_EULER", "Z")}
+
+# Registered by a script rather than enabled, so there are no addon preferences to read the budget from
+def test_startup_ticks_without_addon_preferences(work):
+    startup = importlib.import_module(work.__name__.rsplit(".", 1)[0] + ".startup")
+    assert work.__name__.rsplit(".", 1)[0] not in bpy.context.preferences.addons
+    assert work.Scheduler().time_slice() == work.Scheduler.default_slice
+    startup.Startup.steps = iter(["rest"])
+    assert startup.Startup().tick() is None
+    assert not startup.Startup().running
+
+# A small rig with random keyframes on every channel, half of the cycler's keyframes inverted
+def build_rig_action(work, names, num_frames):
+    armature = bpy.data.armatures.new("Converge_Armature")
+    rig = bpy.data.objects.new("Converge_Rig", armature)
+    bpy.context.scene.collection.objects.link(rig)
+    bpy.context.view_layer.objects.active = rig
+    bpy.ops.object.mode_set(mode="EDIT")
+    for index, name in enumerate(names):
+        bone = armature.edit_bones.new(name)
+        bone.head = (index * 0.1, 0.0, 0.0)
+        bone.tail = (index * 0.1, 0.0, 1.0)
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    rng = random.Random(0)
+    action = bpy.data.actions.new("Converge_Action")
+    for name in names:
+        for type in ("location", "rotation_euler", "scale"):
+            for array_index in range(3):
+                fcurve = action.fcurves.new('pose.bones["{0}"].{1}'.format(name, type), index=array_index, action_group=name)
+                frames = sorted(rng.sample(range(num_frames + 1), 8))
+                fcurve.keyframe_points.add(len(frames))
+                fcurve.keyframe_points.foreach_set("co", [item for frame in frames for item in (frame, rng.uniform(-1.0, 1.0))])
+                fcurve.update()
+
+    cycler = bpy.context.scene.scg_cycler_context
+    cycler.rig_actions.rig_actions.add()
+    cycler.rig_actions.current_rig_action = len(cycler.rig_actions.rig_actions) - 1
+    rig_action = cycler.rig_action
+    rig_action.armature = armature
+    rig_action.action = action
+    for index in range(3):
+        marker = rig_action.timings.frame_markers.add()
+        marker.name = "Marker_{0}".format(index)
+        marker.length = 50.0 / 3
+    for name in names:
+        control = rig_action.controls.add(name)
+        control.mirrored = control.mirrors
+        for channel in control:
+            for marker in rig_action.timings.frame_markers:
+                keyframe = channel.add(marker.name.upper())
+                keyframe.offset = rng.uniform(0.0, 10.0)
+                keyframe.inverted = rng.random() < 0.5
+    return rig_action
+
+def fcurve_points(action):
+    return {(fcurve.data_path, fcurve.array_index):[tuple(point.co) + tuple(point.handle_left) + tuple(point.handle_right) for point in fcurve.keyframe_points] for fcurve in action.fcurves}
+
+# There is no depsgraph update to mark what the auto update wrote, so converge() has to check it again itself
+def test_converge_reaches_a_fixed_point(work):
+    rig_action = build_rig_action(work, ["arm.L", "arm.R", "spine"], 48)
+    work.DirtyTracker().mark_everything()
+    processed, converged = work.Scheduler().converge(max_jobs=5000, all_rig_actions=True)
+    assert converged and processed > 1
+    converged_points = fcurve_points(rig_action.action)
+
+    work.DirtyTracker().mark_everything()
+    processed, converged = work.Scheduler().converge(max_jobs=5000, all_rig_actions=True)
+    assert converged and processed == 1
+    assert fcurve_points(rig_action.action) == converged_points
+
+# Changing a channel's axis changes its key without adding or removing anything, a lookup by the new key still has to find it
+def test_lookup_finds_a_child_whose_key_changed(work):
+    control = build_rig_action(work, ["hand"], 24).controls.get("hand")
+    control.remove("LOCATION", "Y")
+    assert control.get("LOCATION", "Y") is None
+    channel = control.get("LOCATION", "X")
+    channel.axis = "Y"
+    assert control.get("LOCATION", "Y") == channel
+    assert control.get("LOCATION", "X") is None
@@ -4,19 +4,26 @@ import json
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
 from .frame_markers import SCG_Cycler_Frame_Markers
 from .constants import FPS_MODES, FPS_MODES_ENUM
-from .work import WorkQueue, FPSChangedJob, AnimationLengthChangedJob
+from .work import WorkQueue, BulkLoad, FPSChangedJob, AnimationLengthChangedJob
+from .metrics import traced
 
 ###############
 #   Timings   #
 ###############
 class SCG_Cycler_Timing(bpy.types.PropertyGroup, Context_Interface):
 
+    @traced("update_fps")
     def update_fps(self, context):
+        if BulkLoad.active:
+            return
         job = FPSChangedJob(self.animation_length, bpy.context.scene.render.fps, int(self.fps_mode))
         WorkQueue().add(job)
     fps_mode : bpy.props.EnumProperty(items=FPS_MODES_ENUM, name="FPS Mode", update=update_fps)
     
+    @traced("update_animation_length")
     def update_animation_length(self, context):
+        if BulkLoad.active:
+            return
         job = AnimationLengthChangedJob(bpy.context.scene.frame_end/bpy.context.scene.render.fps, self.animation_length, bpy.context.scene.render.fps)
         WorkQueue().add(job)
     animation_length : bpy.props.FloatProperty(name="Animation Length", update=update_animation_length, unit="TIME", subtype="TIME")
@@ -1,165 +1,659 @@
 import bpy
 import time
-import queue
+import collections
+import numpy as np
 from .interfaces import SCG_Cycler_Context_Interface as Context_Interface
+from .constants import KEYFRAME_DEFAULTS, FRAME_TOLERANCE
+from .fcurve_index import FrameIndex
+from .planner import KeyframeArrays, ChannelPlan, ENUM_ATTRIBUTES, FLOAT_ATTRIBUTES, AUTO_HANDLE_TYPES
+from .planner import plan as plan_keyframes, remap_frames
+from .metrics import WorkMetrics, Tracer
+
+# Job priorities, lower runs first
+PRIORITY_USER = 0           # Direct results of the user changing something, like resizing or moving an offset
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2     # Keeping the rig converged, like the AutoUpdateJob
 
 # This is called to make the WorkQueue do its thing
 def work_tick():
-    start_time = time.time()
-    current_time = start_time
-    cutoff_time = start_time + 0.1  # So we can process multiple jobs in an update, and not hang from the queue constantly filling
-    if bpy.context.scene.scg_cycler_context.rig_action and bpy.context.scene.scg_cycler_context.rig_action.action and WorkQueue().job_queue.empty():
-        WorkQueue().add(AutoUpdateJob())
-    while current_time < cutoff_time and not WorkQueue().job_queue.empty(): # Only work when we have time and shit to do
-        WorkQueue().process()
-        current_time = time.time()
-    return 0.5
+    with Tracer().span("work_tick", "scheduler"):
+        return Scheduler().tick()
+
+# Singleton that decides how long each work_tick gets, and when the next one runs
+class Scheduler:
+    min_interval = 0.05         # Interval used as soon as there is work again
+    backlog_interval = 0.0      # Run again straight away while there is a backlog
+    idle_interval = 0.05        # Grows while idle, so an untouched rig barely costs anything
+    frame_time = None           # Smoothed time between viewport redraws, while the user is interacting
+    last_draw = None
+    last_slice = 0.0
+    ticking = False
+    converging = False          # Set by converge(), which checks every channel it wrote again, see DirtyTracker.channel_written
+    draw_handler = None
+    round_robin = 0             # Which of the other rig actions gets the next auto update
+    sleeping = False            # Timer stopped until something changes, in event driven mode
+    default_slice = 0.1         # Used while the addon isn't in the preferences, the same as the default Maximum Work Budget
+
+    # None while the addon isn't in the preferences, like when it is registered by a script instead of enabled
+    @property
+    def preferences(self):
+        addon = bpy.context.preferences.addons.get(__package__)
+        return addon.preferences if addon is not None else None
+
+    # Called after every 3D viewport redraw
+    def viewport_drawn(self):
+        now = time.perf_counter()
+        if Scheduler.last_draw is not None and now - Scheduler.last_draw < 0.25: # Longer gaps mean the user isn't interacting
+            interval = now - Scheduler.last_draw
+            Scheduler.frame_time = interval if Scheduler.frame_time is None else Scheduler.frame_time * 0.8 + interval * 0.2
+        Scheduler.last_draw = now
+        Tracer().instant("viewport_draw", "blender")
+
+    # How long this tick may spend on jobs
+    # While the viewport is being redrawn, we get whatever part of a frame the redraw itself doesn't use
+    def time_slice(self):
+        preferences = self.preferences
+        if preferences is None:
+            return Scheduler.default_slice
+        min_slice = preferences.work_budget_min / 1000.0
+        max_slice = preferences.work_budget_max / 1000.0
+        interactive = Scheduler.last_draw is not None and time.perf_counter() - Scheduler.last_draw < 0.25
+        if not interactive or Scheduler.frame_time is None:
+            return max_slice
+        draw_time = max(0.0, Scheduler.frame_time - Scheduler.last_slice)
+        return min(max(1.0 / preferences.target_frame_rate - draw_time, min_slice), max_slice)
+
+    # None stops the timer, in event driven mode it is started again by wake() when something changes
+    def next_interval(self, worked):
+        if not WorkQueue().empty():
+            return Scheduler.backlog_interval
+        preferences = self.preferences
+        if worked:
+            Scheduler.idle_interval = Scheduler.min_interval
+        elif preferences is None or preferences.event_driven:
+            Scheduler.sleeping = True
+            return None
+        else:
+            Scheduler.idle_interval = min(Scheduler.idle_interval * 2, preferences.idle_interval_max)
+        return Scheduler.idle_interval
+
+    def tick(self):
+        start_time = time.perf_counter()
+        cutoff_time = start_time + self.time_slice()  # So we can process multiple jobs in an update, and not hang from the queue constantly filling
+        self.queue_auto_update()
+        worked = not WorkQueue().empty()
+        Scheduler.ticking = True
+        try:
+            # Only work when we have time and shit to do, but always finish what the jobs so far started
+            with Transaction() as transaction:
+                while (time.perf_counter() < cutoff_time or transaction.open_jobs > 0) and not WorkQueue().empty():
+                    WorkQueue().process()
+        finally:
+            Scheduler.ticking = False
+        Scheduler.last_slice = time.perf_counter() - start_time
+        WorkMetrics().tick_done(Scheduler.last_slice, cutoff_time - start_time, WorkQueue().depth())
+        return self.next_interval(worked)
+
+    # Queues an AutoUpdateJob when the queue is empty and something changed since the last one
+    # The selected rig action always goes first, the others take turns, one per tick, while all_rig_actions is on
+    def queue_auto_update(self, all_rig_actions=None):
+        if not WorkQueue().empty():
+            return
+        cycler = bpy.context.scene.scg_cycler_context
+        if all_rig_actions is None:
+            all_rig_actions = cycler.auto_update_all
+        selected = cycler.rig_actions.current_rig_action if cycler.rig_action is not None else None
+        order = [selected] if selected is not None else []
+        if all_rig_actions:
+            others = [index for index in range(len(cycler.rig_actions.rig_actions)) if index != selected]
+            if len(others) > 0:
+                turn = Scheduler.round_robin % len(others)
+                order += others[turn:] + others[:turn]
+        for index in order:
+            rig_action = cycler.rig_actions.rig_actions[index]
+            if rig_action.action is None or not DirtyTracker().is_dirty(rig_action.name):
+                continue
+            if index != selected:
+                Scheduler.round_robin = others.index(index) + 1
+            job = AutoUpdateJob(*DirtyTracker().take(rig_action.name))
+            job.rig_action_name = rig_action.name
+            WorkQueue().add(job)
+            return
+
+    # Works through the queue, and the auto updates that follow, until a pass writes nothing
+    # For headless use, where there is no timer to do it a slice at a time, and no depsgraph update to mark what was written
+    def converge(self, max_jobs=1000000, all_rig_actions=None):
+        processed = 0
+        Scheduler.ticking = True
+        Scheduler.converging = True
+        try:
+            while processed < max_jobs:
+                self.queue_auto_update(all_rig_actions)
+                if WorkQueue().empty():
+                    return processed, True
+                # Committed before the next auto update, so it plans from updated fcurves
+                with Transaction():
+                    while processed < max_jobs and not WorkQueue().empty():
+                        WorkQueue().process()
+                        processed += 1
+            return processed, False
+        finally:
+            Scheduler.ticking = False
+            Scheduler.converging = False
+
+    # Brings the next tick forward when work turns up while we are backing off or asleep
+    def wake(self):
+        if Scheduler.ticking:
+            return
+        if Scheduler.sleeping:
+            Scheduler.sleeping = False
+            Scheduler.idle_interval = Scheduler.min_interval
+            if bpy.context.scene.scg_cycler_context.auto_update and not bpy.app.timers.is_registered(work_tick):
+                bpy.app.timers.register(work_tick, first_interval=0.0)
+            return
+        if Scheduler.idle_interval <= Scheduler.min_interval:
+            return
+        if not bpy.app.timers.is_registered(work_tick):
+            return
+        Scheduler.idle_interval = Scheduler.min_interval
+        bpy.app.timers.unregister(work_tick)
+        bpy.app.timers.register(work_tick, first_interval=0.0)
+
+    def start(self):
+        if Scheduler.draw_handler is None:
+            Scheduler.draw_handler = bpy.types.SpaceView3D.draw_handler_add(self.viewport_drawn, (), "WINDOW", "POST_PIXEL")
+
+    def stop(self):
+        if Scheduler.draw_handler is not None:
+            bpy.types.SpaceView3D.draw_handler_remove(Scheduler.draw_handler, "WINDOW")
+            Scheduler.draw_handler = None
+
+# Works out the name of the bone on the other side of the rig, the same way SCG_Cycler_Control.mirror_name does
+def mirror_bone_name(bone_name):
+    if ".L" in bone_name:
+        return bone_name.replace(".L", ".R")
+    elif ".R" in bone_name:
+        return bone_name.replace(".R", ".L")
+    return bone_name
+
+# Cheap summary of the keyframe points of an fcurve, used to notice edits made outside of the cycler
+def fcurve_fingerprint(fcurve):
+    if fcurve is None:
+        return None
+    count = len(fcurve.keyframe_points)
+    co = [0.0] * (count * 2)
+    left_handles = [0.0] * (count * 2)
+    right_handles = [0.0] * (count * 2)
+    interpolations = [0] * count
+    left_types = [0] * count
+    right_types = [0] * count
+    fcurve.keyframe_points.foreach_get("co", co)
+    fcurve.keyframe_points.foreach_get("handle_left", left_handles)
+    fcurve.keyframe_points.foreach_get("handle_right", right_handles)
+    fcurve.keyframe_points.foreach_get("interpolation", interpolations)
+    fcurve.keyframe_points.foreach_get("handle_left_type", left_types)
+    fcurve.keyframe_points.foreach_get("handle_right_type", right_types)
+    # Auto handles follow from the keyframes, and are only worked out again when the fcurve is updated,
+    # so a fingerprint taken straight after a write still matches once the transaction commits
+    left_handles = [0.0 if left_types[index // 2] in AUTO_HANDLE_TYPES else value for index, value in enumerate(left_handles)]
+    right_handles = [0.0 if right_types[index // 2] in AUTO_HANDLE_TYPES else value for index, value in enumerate(right_handles)]
+    return hash((tuple(co), tuple(left_handles), tuple(right_handles), tuple(interpolations), tuple(left_types), tuple(right_types)))
+
+# What the AutoUpdateJob needs to look at in one rig action
+class DirtyState:
+    def __init__(self):
+        self.all_dirty = True
+        self.controls = set()
+        self.channels = set()
+        self.fcurves_edited = False
+        self.fingerprints = {}
+
+# Singleton record of what the AutoUpdateJob needs to look at, kept per rig action by name
+# Channels are keyed by (bone_name, type, axis), so they survive the RNA collections being reallocated
+# rig_action_name defaults to the rig action being worked on, see SCG_Cycler_Rig_Actions.rig_action
+class DirtyTracker:
+    states = {}
+
+    def state(self, rig_action_name=None):
+        if rig_action_name is None:
+            rig_action = bpy.context.scene.scg_cycler_context.rig_action
+            rig_action_name = rig_action.name if rig_action is not None else None
+        if rig_action_name not in DirtyTracker.states:
+            DirtyTracker.states[rig_action_name] = DirtyState() # Rig actions we haven't seen yet need a full look
+        return DirtyTracker.states[rig_action_name]
+
+    def is_dirty(self, rig_action_name=None):
+        state = self.state(rig_action_name)
+        return state.all_dirty or state.fcurves_edited or len(state.controls) > 0 or len(state.channels) > 0
+
+    def mark_all(self, rig_action_name=None):
+        self.state(rig_action_name).all_dirty = True
+        Scheduler().wake()
+
+    # Every rig action, along with what we knew about their fcurves, for when the file is loaded or undone
+    def mark_everything(self):
+        DirtyTracker.states = {}
+        Scheduler().wake()
+
+    # A control's channels are read by its mirror control, so both sides need another look
+    def mark_control(self, bone_name, rig_action_name=None):
+        state = self.state(rig_action_name)
+        state.controls.add(bone_name)
+        state.controls.add(mirror_bone_name(bone_name))
+        Scheduler().wake()
+
+    def mark_channel(self, bone_name, type, axis, rig_action_name=None):
+        state = self.state(rig_action_name)
+        state.channels.add((bone_name, type, axis))
+        state.channels.add((mirror_bone_name(bone_name), type, axis))
+        Scheduler().wake()
+
+    def mark_fcurves_edited(self, rig_action_name=None):
+        self.state(rig_action_name).fcurves_edited = True
+        Scheduler().wake()
+
+    def take(self, rig_action_name=None):
+        state = self.state(rig_action_name)
+        dirty = (state.all_dirty, state.controls, state.channels, state.fcurves_edited)
+        state.all_dirty = False
+        state.controls = set()
+        state.channels = set()
+        state.fcurves_edited = False
+        return dirty
+
+    # Puts back what a cancelled job was going to look at, in the form take() hands it out
+    def restore(self, dirty, rig_action_name=None):
+        all_dirty, controls, channels, fcurves_edited = dirty
+        state = self.state(rig_action_name)
+        state.all_dirty |= all_dirty
+        state.controls |= controls
+        state.channels |= channels
+        state.fcurves_edited |= fcurves_edited
+        Scheduler().wake()
+
+    def channel_fingerprint(self, channel):
+        mirror_fcurve = channel.mirror_fcurve if channel.control.mirrored else None
+        return (fcurve_fingerprint(channel.fcurve), fcurve_fingerprint(mirror_fcurve))
+
+    # Returns True if the channel, or what it mirrors from, changed since it was last processed
+    def channel_changed(self, channel):
+        key = (channel.parent_name, channel.type, channel.axis)
+        return self.state().fingerprints.get(key) != self.channel_fingerprint(channel)
+
+    def store_fingerprint(self, channel):
+        key = (channel.parent_name, channel.type, channel.axis)
+        self.state().fingerprints[key] = self.channel_fingerprint(channel)
+
+    # A job an AutoUpdateJob queued is done writing the channel's fcurve, so what it wrote is what the channel should look like
+    # While converging the channel is planned again too, and converge() only stops once that changes nothing
+    def channel_written(self, channel):
+        self.store_fingerprint(channel)
+        if Scheduler.converging:
+            self.mark_channel(channel.parent_name, channel.type, channel.axis)
+
+# Set while a template or saved rig action is applied in one go, see SCG_Cycler_Rig_Action.load_from_json_data
+# Property callbacks leave their jobs, dirty marks and panels to the end of the load, which does each once for everything
+class BulkLoad:
+    active = False
+
+    def __enter__(self):
+        self.was_active = BulkLoad.active
+        BulkLoad.active = True
+        return self
+
+    def __exit__(self, *args):
+        BulkLoad.active = self.was_active
+        return False
+
+# Collects the fcurves a tick changed, so each is updated once and each action tagged once when it commits
+# Jobs queued by a job in the transaction belong to it too, and the tick keeps going until they are done,
+# so a channel is never left with only some of its changes, or without its mirror, between redraws
+class Transaction:
+    current = None
+
+    def __init__(self):
+        self.fcurves = {}
+        self.open_jobs = 0
+        self.enclosing = None
+
+    # A nested transaction hands its fcurves to the one around it, so they are still only updated once, when that commits
+    def __enter__(self):
+        self.enclosing = Transaction.current
+        Transaction.current = self
+        return self
+
+    def __exit__(self, *args):
+        Transaction.current = self.enclosing
+        if self.enclosing is not None:
+            self.enclosing.fcurves.update(self.fcurves)
+            return False
+        self.commit()
+        return False
+
+    def touch(self, fcurve):
+        self.fcurves[fcurve.as_pointer()] = fcurve
+
+    def commit(self):
+        if len(self.fcurves) == 0:
+            return
+        with Tracer().span("commit", "transaction", {"fcurves":len(self.fcurves)} if Tracer.enabled else None):
+            actions = {}
+            for fcurve in self.fcurves.values():
+                fcurve.update()
+                actions[fcurve.id_data.as_pointer()] = fcurve.id_data
+            for action in actions.values():
+                action.update_tag()
+        self.fcurves = {}
+
+# Sorts the fcurve and recalculates its handles when the transaction commits, or straight away outside of one
+def fcurve_changed(fcurve):
+    if Transaction.current is not None:
+        Transaction.current.touch(fcurve)
+    else:
+        fcurve.update()
 
 class WorkQueue(Context_Interface):
-    # Singleton job queue
-    job_queue = queue.Queue()
+    # Singleton job queues, one per priority
+    job_queues = {priority:collections.deque() for priority in (PRIORITY_USER, PRIORITY_NORMAL, PRIORITY_BACKGROUND)}
+    # Jobs waiting in the queue that can be merged with newer ones, by their coalesce key
+    pending = {}
+    # The job being worked on, jobs it adds inherit its priority and rig action
+    current_job = None
+    # The rig action the current job works on, see SCG_Cycler_Rig_Actions.rig_action
+    rig_action = None
 
     def add(self, job):
-        self.job_queue.put(job)
-
+        if job.priority is None:
+            job.priority = WorkQueue.current_job.priority if WorkQueue.current_job is not None else PRIORITY_NORMAL
+        key = self.pending_key(job)
+        if key is not None and key in self.pending:
+            pending_job = self.pending[key]
+            # The pending job already covers the new one
+            if not job.coalesce(pending_job):
+                return
+            pending_job.cancelled = True
+            job.priority = min(job.priority, pending_job.priority)
+        if key is not None:
+            self.pending[key] = job
+        # Background jobs were planned before this change, so they are dropped and what they covered is planned again
+        if job.priority == PRIORITY_USER and not self.empty(PRIORITY_BACKGROUND):
+            for cancelled_job in self.cancel(PRIORITY_BACKGROUND):
+                DirtyTracker().restore(cancelled_job.dirty, cancelled_job.rig_action_name)
+        job.enqueued_at = time.perf_counter()
+        if Transaction.current is not None and WorkQueue.current_job is not None:
+            job.transaction = Transaction.current
+            job.transaction.open_jobs += 1
+        self.job_queues[job.priority].append(job)
+        Scheduler().wake()
+
+    # Jobs only merge with jobs for the same rig action
+    def pending_key(self, job):
+        key = job.coalesce_key
+        return None if key is None else (job.rig_action_name, key)
+
+    # Returns the jobs that were cancelled, leaving out ones that already were
+    def cancel(self, priority):
+        cancelled_jobs = []
+        for job in self.job_queues[priority]:
+            if not job.cancelled:
+                cancelled_jobs.append(job)
+            job.cancelled = True
+            key = self.pending_key(job)
+            if key is not None and self.pending.get(key) is job:
+                del self.pending[key]
+            self.retire(job)
+        self.job_queues[priority].clear()
+        return cancelled_jobs
+
+    def empty(self, priority=None):
+        priorities = self.job_queues if priority is None else (priority,)
+        for priority in priorities:
+            job_queue = self.job_queues[priority]
+            while len(job_queue) > 0 and job_queue[0].cancelled:
+                self.retire(job_queue.popleft())
+            if len(job_queue) > 0:
+                return False
+        return True
+
+    # A job leaving the queue, done or cancelled, is no longer holding its transaction open
+    def retire(self, job):
+        if job.transaction is not None:
+            job.transaction.open_jobs -= 1
+            job.transaction = None
+
+    # Jobs waiting, including cancelled ones that haven't been popped yet
+    def depth(self):
+        return sum(len(job_queue) for job_queue in self.job_queues.values())
+
+    # Outside of a tick, the job and every job it queues are done together in their own transaction
     def process(self):
-        if not self.job_queue.empty(): # Not really needed, but doesn't hurt to be safe for now
-            next_job = self.job_queue.get()
-            next_job.work()
-            self.job_queue.task_done()
+        if Transaction.current is None:
+            with Transaction() as transaction:
+                self.process()
+                while transaction.open_jobs > 0 and not self.empty():
+                    self.process()
+            return
+        for priority, job_queue in self.job_queues.items():
+            if self.empty(priority):
+                continue
+            next_job = job_queue.popleft()
+            self.retire(next_job)
+            key = self.pending_key(next_job)
+            if key is not None and self.pending.get(key) is next_job:
+                del self.pending[key]
+            rig_action = None
+            if next_job.rig_action_name is not None:
+                rig_action = self.cycler.rig_actions.find(next_job.rig_action_name)
+                if rig_action is None: # Removed since the job was queued
+                    return
+            WorkQueue.current_job = next_job
+            WorkQueue.rig_action = rig_action
+            # Only time jobs while someone is looking at the metrics
+            start_time = time.perf_counter() if WorkMetrics().active else None
+            try:
+                with Tracer().span(next_job.type, "job", next_job.trace_args if Tracer.enabled else None):
+                    next_job.work()
+            finally:
+                WorkQueue.current_job = None
+                WorkQueue.rig_action = None
+            WorkMetrics().job_done(next_job, None if start_time is None else time.perf_counter() - start_time)
+            return
 
 class Job(Context_Interface):
+    # None means the priority of whichever job added it
+    priority = None
+
     def __init__(self, type):
         self.type = type
+        self.cancelled = False
+        self.enqueued_at = time.perf_counter()
+        self.transaction = None
+        self.channel_key = None # (bone_name, type, axis) of the channel an AutoUpdateJob queued this job for
+        # Jobs work on the rig action they were made for, even if another one is selected by the time they run
+        if WorkQueue.current_job is not None:
+            self.rig_action_name = WorkQueue.current_job.rig_action_name
+        else:
+            rig_action = self.cycler.rig_action
+            self.rig_action_name = rig_action.name if rig_action is not None else None
         self.work_queue = WorkQueue() # Easy accessor to the queue for jobs, so that they can add their own jobs, but not really needed since the queue is a singleton
 
+    # Jobs with the same key are merged while they wait in the queue, None means never merge
+    @property
+    def coalesce_key(self):
+        return None
+
+    # Called when a job with the same key is still pending
+    # Return True to replace it and go to the back of the queue, or False to drop this job and keep the pending one
+    def coalesce(self, pending_job):
+        return True
+
+    # What the AutoUpdateJob has to look at again if this job is cancelled before it runs, see DirtyTracker.take
+    @property
+    def dirty(self):
+        return (False, set(), {self.channel_key} if self.channel_key is not None else set(), False)
+
+    # Jobs an AutoUpdateJob queued hand their channel back once they are done, see DirtyTracker.channel_written
+    def channel_written(self):
+        if self.channel_key is None:
+            return
+        bone_name, type, axis = self.channel_key
+        control = self.cycler.rig_action.controls.get(bone_name)
+        channel = control.get(type, axis) if control is not None else None
+        if channel is not None:
+            DirtyTracker().channel_written(channel)
+
+    # What the trace shows about this job, only asked for while tracing
+    @property
+    def trace_args(self):
+        if getattr(self, "fcurve", None) is not None:
+            return {"fcurve":"{0}[{1}]".format(self.fcurve.data_path, self.fcurve.array_index)}
+        if getattr(self, "keyframe", None) is not None:
+            return {"keyframe":self.keyframe.path_from_id()}
+        return {}
+
     def work(self):
         return
 
-# Inserts a keyframe into the target fcurve
-class AddKeyframeJob(Job):
-    def __init__(self, fcurve, frame, value, amplitude=None, back=None, easing=None, left_handle_type=None, right_handle_type=None, left_handle=None, right_handle=None, interpolation=None, period=None, type=None):
-        Job.__init__(self, "ADD_KEYFRAME")
+# Removes every keyframe point close enough to one of the frames from the target fcurve
+class RemoveKeyframesJob(Job):
+    def __init__(self, fcurve, frames, tolerance=FRAME_TOLERANCE):
+        Job.__init__(self, "REMOVE_KEYFRAMES")
         self.fcurve = fcurve
-        self.frame = frame
-        self.value = value
-        self.amplitude = amplitude
-        self.back = back
-        self.easing = easing
-        self.left_handle_type = left_handle_type
-        self.right_handle_type = right_handle_type
-        self.left_handle = left_handle
-        self.right_handle = right_handle
-        self.interpolation = interpolation
-        self.period = period
-        self.type = type
+        self.frames = set(frames)
+        self.tolerance = tolerance
 
-    def work(self):
-        keyframe = self.fcurve.keyframe_points.insert(self.frame, self.value)
-        if self.amplitude is not None:
-            keyframe.amplitude = self.amplitude
-        if self.back is not None:
-            keyframe.back = self.back
-        if self.easing is not None:
-            keyframe.easing = self.easing
-        if self.left_handle_type is not None:
-            keyframe.handle_left_type = self.left_handle_type
-        if self.right_handle_type is not None:
-            keyframe.handle_right_type = self.right_handle_type
-        if self.left_handle is not None:
-            keyframe.handle_left[0] = self.left_handle[0]
-            keyframe.handle_left[1] = self.left_handle[1]
-        if self.right_handle is not None:
-            keyframe.handle_right[0] = self.right_handle[0]
-            keyframe.handle_right[1] = self.right_handle[1]
-        if self.interpolation is not None:
-            keyframe.interpolation = self.interpolation
-        if self.period is not None:
-            keyframe.period = self.period
-        if self.type is not None:
-            keyframe.type = self.type
-
-# Removes a specific keyframe from the target fcurve
-class RemoveKeyframeJob(Job):
-    def __init__(self, fcurve, frame):
-        Job.__init__(self, "REMOVE_KEYFRAME")
-        self.fcurve = fcurve
-        self.frame = frame
+    @property
+    def coalesce_key(self):
+        return ("REMOVE_KEYFRAMES", self.fcurve.as_pointer())
 
-    def work(self):
-        for keyframe_point in self.fcurve.keyframe_points:
-            if keyframe_point.co[0] == self.frame:
-                self.fcurve.keyframe_points.remove(keyframe_point)
-                return
-
-# Changes the frame of a keyframe
-class MoveKeyframeJob(Job):
-    def __init__(self, keyframe, new_frame):
-        Job.__init__(self, "MOVE_KEYFRAME")
-        self.keyframe = keyframe
-        self.new_frame = new_frame
+    def coalesce(self, pending_job):
+        self.frames |= pending_job.frames
+        return True
 
+    # Finds every matching keyframe point with a single foreach_get, and removes them from the back
+    # so the indices still to be removed don't shift. Leaves the fcurve.update() to whoever queued us
     def work(self):
-        old_pos = self.keyframe.co[0]
-        difference = self.new_frame - old_pos
-        self.keyframe.co[0] = self.new_frame
-        self.keyframe.handle_left[0] += difference
-        self.keyframe.handle_right[0] += difference
-
-# Changes the value of a keyframe
-class ChangeKeyframeValueJob(Job):
-    def __init__(self, keyframe, new_value, amplitude=None, back=None, easing=None, left_handle_type=None, right_handle_type=None, left_handle=None, right_handle=None, interpolation=None, period=None, type=None):
-        Job.__init__(self, "CHANGE_KEYFRAME_VALUE")
-        self.keyframe = keyframe
-        self.new_value = new_value
-        self.amplitude = amplitude
-        self.back = back
-        self.easing = easing
-        self.left_handle_type = left_handle_type
-        self.right_handle_type = right_handle_type
-        self.left_handle = left_handle
-        self.right_handle = right_handle
-        self.interpolation = interpolation
-        self.period = period
-        self.type = type
+        keyframe_points = self.fcurve.keyframe_points
+        count = len(keyframe_points)
+        if count == 0 or len(self.frames) == 0:
+            self.channel_written()
+            return
+        co = np.empty(count * 2, dtype=np.float32)
+        keyframe_points.foreach_get("co", co)
+        frames = co[0::2].astype(np.float64)
+        targets = np.sort(np.fromiter(self.frames, dtype=np.float64, count=len(self.frames)))
+
+        # Distance from each keyframe point to the closest frame we were asked to remove
+        positions = np.clip(np.searchsorted(targets, frames), 1, max(len(targets) - 1, 1))
+        distances = np.minimum(np.abs(frames - targets[positions - 1]), np.abs(frames - targets[np.minimum(positions, len(targets) - 1)]))
+        for index in np.nonzero(distances <= self.tolerance)[0][::-1].tolist():
+            keyframe_points.remove(keyframe_points[index], fast=True)
+        self.channel_written()
+
+# Looks up the integer foreach_get/foreach_set uses for an enum identifier on a Keyframe
+keyframe_enum_values = {}
+def keyframe_enum_value(property_name, identifier):
+    key = (property_name, identifier)
+    if key not in keyframe_enum_values:
+        keyframe_enum_values[key] = bpy.types.Keyframe.bl_rna.properties[property_name].enum_items[identifier].value
+    return keyframe_enum_values[key]
+
+# Collects every insert and change for one fcurve, then writes them all with foreach_set and a single update
+# Frames that don't exist yet are added in one keyframe_points.add(), instead of an insert() each
+class WriteKeyframesJob(Job):
+    enum_properties = ENUM_ATTRIBUTES
+    float_properties = FLOAT_ATTRIBUTES
 
-    def work(self):
-        self.keyframe.co[1] = self.new_value
-        if self.amplitude is not None:
-            self.keyframe.amplitude = self.amplitude
-        if self.back is not None:
-            self.keyframe.back = self.back
-        if self.easing is not None:
-            self.keyframe.easing = self.easing
-        if self.left_handle_type is not None:
-            self.keyframe.handle_left_type = self.left_handle_type
-        if self.right_handle_type is not None:
-            self.keyframe.handle_right_type = self.right_handle_type
-        if self.left_handle is not None:
-            self.keyframe.handle_left[0] = self.left_handle[0]
-            self.keyframe.handle_left[1] = self.left_handle[1]
-        if self.right_handle is not None:
-            self.keyframe.handle_right[0] = self.right_handle[0]
-            self.keyframe.handle_right[1] = self.right_handle[1]
-        if self.interpolation is not None:
-            self.keyframe.interpolation = self.interpolation
-        if self.period is not None:
-            self.keyframe.period = self.period
-        if self.type is not None:
-            self.keyframe.type = self.type
-
-# Call this after making changes to an FCurve to update it, needs to manually be done
-# otherwise we would be calling it after every change which isn't needed
-class UpdateFCurveJob(Job):
     def __init__(self, fcurve):
-        Job.__init__(self, "UPDATE_FCURVE")
+        Job.__init__(self, "WRITE_KEYFRAMES")
         self.fcurve = fcurve
+        self.writes = {}
+
+    def __len__(self):
+        return len(self.writes)
+
+    @property
+    def coalesce_key(self):
+        return ("WRITE_KEYFRAMES", self.fcurve.as_pointer())
+
+    # Older writes still apply, unless this job writes the same frame
+    def coalesce(self, pending_job):
+        writes = dict(pending_job.writes)
+        writes.update(self.writes)
+        self.writes = writes
+        return True
+
+    # The keyframe at frame ends up as if it was freshly inserted, anything not given uses the defaults
+    def insert(self, frame, value, **kwargs):
+        self.writes[frame] = (value, True, kwargs)
+
+    # The keyframe at frame keeps anything not given, unless it has to be added
+    def change(self, frame, value, **kwargs):
+        self.writes[frame] = (value, False, kwargs)
+
+    def defaults(self):
+        edit = bpy.context.preferences.edit
+        return {"handle_left_type":edit.keyframe_new_handle_type, "handle_right_type":edit.keyframe_new_handle_type,
+            "interpolation":edit.keyframe_new_interpolation_type, "easing":KEYFRAME_DEFAULTS["easing"], "type":KEYFRAME_DEFAULTS["type"],
+            "amplitude":KEYFRAME_DEFAULTS["amplitude"], "back":KEYFRAME_DEFAULTS["back"], "period":KEYFRAME_DEFAULTS["period"]}
 
     def work(self):
-        self.fcurve.update()         
+        if len(self.writes) == 0:
+            self.channel_written()
+            return
+        keyframe_points = self.fcurve.keyframe_points
+        count = len(keyframe_points)
+        co = [0.0] * (count * 2)
+        keyframe_points.foreach_get("co", co)
+        indices = {co[index * 2]:index for index in range(count)}
+
+        new_frames = [frame for frame in self.writes if frame not in indices]
+        if len(new_frames) > 0:
+            keyframe_points.add(len(new_frames))
+            for index, frame in enumerate(new_frames):
+                indices[frame] = count + index
+        total = count + len(new_frames)
+
+        arrays = {"co":[0.0] * (total * 2), "handle_left":[0.0] * (total * 2), "handle_right":[0.0] * (total * 2)}
+        for property_name in self.enum_properties:
+            arrays[property_name] = [0] * total
+        for property_name in self.float_properties:
+            arrays[property_name] = [0.0] * total
+        for property_name, array in arrays.items():
+            keyframe_points.foreach_get(property_name, array)
+
+        defaults = self.defaults()
+        for frame, (value, fresh, kwargs) in self.writes.items():
+            index = indices[frame]
+            fresh = fresh or index >= count
+            arrays["co"][index * 2] = frame
+            arrays["co"][index * 2 + 1] = value
+            for handle_name, kwarg_name in (("handle_left", "left_handle"), ("handle_right", "right_handle")):
+                handle = kwargs.get(kwarg_name)
+                if handle is None and fresh:
+                    handle = (frame, value)
+                if handle is not None:
+                    arrays[handle_name][index * 2] = handle[0]
+                    arrays[handle_name][index * 2 + 1] = handle[1]
+            for property_name in self.enum_properties + self.float_properties:
+                property_value = kwargs.get(property_name)
+                if property_value is None and fresh:
+                    property_value = defaults[property_name]
+                if property_value is None:
+                    continue
+                if isinstance(property_value, str):
+                    property_value = keyframe_enum_value(property_name, property_value)
+                arrays[property_name][index] = property_value
+
+        for property_name, array in arrays.items():
+            keyframe_points.foreach_set(property_name, array)
+        fcurve_changed(self.fcurve)
+        self.channel_written()
 
 # Called when FPS changed, or Animation Length is changed
 class ResizeAnimationJob(Job):
+    priority = PRIORITY_USER
+
     def __init__(self, old_animation_length, new_animation_length, old_fps, new_fps):
         Job.__init__(self, "RESIZE_ANIMATION")
         self.old_animation_length = old_animation_length
@@ -186,18 +680,18 @@ class ResizeAnimationJob(Job):
         bpy.context.scene.render.fps = self.new_fps
         bpy.context.scene.frame_start = 0
         bpy.context.scene.frame_end = num_animated_frames
+        DirtyTracker().mark_all()
+
+        old_num_frames = round(self.old_animation_length * self.old_fps)
+        old_half_point = old_num_frames / 2
+        new_num_frames = round(self.new_animation_length * self.new_fps)
+        new_half_point = new_num_frames / 2
 
         for control in self.cycler.rig_action.controls:
             for channel in control:
                 if channel.fcurve is None or (channel.control.mirrored and channel.mirror_fcurve is None):
                     continue
 
-                old_num_frames = round(self.old_animation_length * self.old_fps)
-                old_half_point = old_num_frames / 2
-
-                new_num_frames = round(self.new_animation_length * self.new_fps)
-                new_half_point = new_num_frames / 2
-
                 frames = {}
 
                 for index, keyframe in enumerate(channel):
@@ -218,63 +712,123 @@ class ResizeAnimationJob(Job):
                     for keyframe in channel.mirror_channel:
                         old_mirror = round(keyframe.frame_marker.old_frame + ((keyframe.offset/100)*old_num_frames) + old_half_point)
                         new_mirror = round(keyframe.frame_marker.frame + ((keyframe.offset/100)*new_num_frames) + new_half_point)
-                        frames[old_mirror] = new_mirror            
-
-                for keyframe_point in channel.fcurve.keyframe_points:
-                    if keyframe_point.co[0] in frames:
-                        self.work_queue.add(MoveKeyframeJob(keyframe_point, frames[keyframe_point.co[0]]))
-                    else:
-                        self.work_queue.add(RemoveKeyframeJob(channel.fcurve, keyframe_point.co[0]))
+                        frames[old_mirror] = new_mirror
 
-                self.work_queue.add(UpdateFCurveJob(channel.fcurve))  
+                self.remap_fcurve(channel.fcurve, frames)
+
+    # Moves every mapped keyframe point and its handles in one foreach_set, and removes the rest, all within this job
+    def remap_fcurve(self, fcurve, frames):
+        keyframe_points = fcurve.keyframe_points
+        count = len(keyframe_points)
+        if count == 0:
+            return
+        co = np.empty(count * 2, dtype=np.float64)
+        left_handles = np.empty(count * 2, dtype=np.float64)
+        right_handles = np.empty(count * 2, dtype=np.float64)
+        keyframe_points.foreach_get("co", co)
+        keyframe_points.foreach_get("handle_left", left_handles)
+        keyframe_points.foreach_get("handle_right", right_handles)
+
+        new_frames, keep = remap_frames(co[0::2], list(frames.keys()), list(frames.values()), FRAME_TOLERANCE)
+        shift = new_frames - co[0::2]
+        co[0::2] = new_frames
+        left_handles[0::2] += shift
+        right_handles[0::2] += shift
+        keyframe_points.foreach_set("co", co)
+        keyframe_points.foreach_set("handle_left", left_handles)
+        keyframe_points.foreach_set("handle_right", right_handles)
+
+        for index in np.nonzero(~keep)[0][::-1].tolist():
+            keyframe_points.remove(keyframe_points[index], fast=True)
+        fcurve_changed(fcurve)
 
 class UpdateKeyframeOffsetJob(Job):
-    def __init__(self, keyframe, old_offset, new_offset):
+    priority = PRIORITY_USER
+
+    # address is (bone_name, type, axis, marker), see SCG_Cycler_Control_Channel_Keyframe.address
+    def __init__(self, address, old_offset, new_offset):
         Job.__init__(self, "UPDATE_OFFSET")
-        self.keyframe = keyframe
+        self.address = address
         self.old_offset = old_offset
         self.new_offset = new_offset
 
+    @property
+    def coalesce_key(self):
+        return ("UPDATE_OFFSET",) + self.address
+
+    @property
+    def trace_args(self):
+        return {"address":"{0} {1} {2} {3}".format(*self.address), "old_offset":self.old_offset, "new_offset":self.new_offset}
+
+    # The keyframe points haven't moved yet, so they are still where the pending job's old offset put them
+    def coalesce(self, pending_job):
+        self.old_offset = pending_job.old_offset
+        return True
+
+    # Moves a keyframe point along with its handles, and keeps the frame index up to date
+    def move_keyframe_point(self, fcurve, index, old_frame, new_frame):
+        keyframe_point = fcurve.keyframe_points[index]
+        difference = new_frame - keyframe_point.co[0]
+        keyframe_point.co[0] = new_frame
+        keyframe_point.handle_left[0] += difference
+        keyframe_point.handle_right[0] += difference
+        FrameIndex().moved(fcurve, old_frame, new_frame, index)
+
     def work(self):
-        for control in self.cycler.rig_action.controls:
-            for channel in control:
-                for keyframe in channel:
-                    if self.keyframe == keyframe:
-
-                        if channel.fcurve is None or (channel.control.mirrored and channel.mirror_fcurve is None):
-                            return
-                        
-                        keyframe_points = {keyframe_point.co[0]:keyframe_point for keyframe_point in channel.fcurve.keyframe_points}                        
-                        num_frames = bpy.context.scene.frame_end
-                        half_point = num_frames / 2
-
-                        old_frame = round(keyframe.frame_marker.frame + (self.old_offset/100)*num_frames)
-                        new_frame = round(keyframe.frame_marker.frame + (self.new_offset/100)*num_frames)
-                        if old_frame in keyframe_points:
-                            self.work_queue.add(MoveKeyframeJob(keyframe_points[old_frame], new_frame))
-
-                            old_half_frame = old_frame + half_point
-                            new_half_frame = new_frame + half_point
-                            if control.mirrored:
-                                mirror_keyframe_points = {keyframe_point.co[0]:keyframe_point for keyframe_point in channel.mirror_fcurve.keyframe_points}
-                                if old_half_frame in mirror_keyframe_points:
-                                    self.work_queue.add(MoveKeyframeJob(mirror_keyframe_points[old_half_frame], new_half_frame))
-                            else:
-                                if old_half_frame in keyframe_points:
-                                    self.work_queue.add(MoveKeyframeJob(keyframe_points[old_half_frame], new_half_frame))
-
-                            old_end_frame = old_frame + num_frames
-                            new_end_frame = new_frame + num_frames
-                            if old_end_frame in keyframe_points:
-                                self.work_queue.add(MoveKeyframeJob(keyframe_points[old_end_frame], new_end_frame))
-                            self.work_queue.add(UpdateFCurveJob(channel.fcurve))  
-                            if control.mirrored:
-                                self.work_queue.add(UpdateFCurveJob(channel.mirror_fcurve))
+        bone_name, type, axis, marker = self.address
+        control = self.cycler.rig_action.controls.get(bone_name)
+        channel = control.get(type, axis) if control is not None else None
+        keyframe = channel.get(marker) if channel is not None else None
+        if keyframe is None:
+            return
+        DirtyTracker().mark_channel(bone_name, type, axis)
+
+        if channel.fcurve is None or (control.mirrored and channel.mirror_fcurve is None):
+            return
+
+        num_frames = bpy.context.scene.frame_end
+        half_point = num_frames / 2
+
+        old_frame = round(keyframe.frame_marker.frame + (self.old_offset/100)*num_frames)
+        new_frame = round(keyframe.frame_marker.frame + (self.new_offset/100)*num_frames)
+        index = FrameIndex().find(channel.fcurve, old_frame)
+        if index is None:
+            return
+
+        # Look everything up before moving anything, so a moved point can't be found again
+        moves = [(channel.fcurve, index, old_frame, new_frame)]
+        old_half_frame = old_frame + half_point
+        new_half_frame = new_frame + half_point
+        half_fcurve = channel.mirror_fcurve if control.mirrored else channel.fcurve
+        half_index = FrameIndex().find(half_fcurve, old_half_frame)
+        if half_index is not None:
+            moves.append((half_fcurve, half_index, old_half_frame, new_half_frame))
+        old_end_frame = old_frame + num_frames
+        new_end_frame = new_frame + num_frames
+        end_index = FrameIndex().find(channel.fcurve, old_end_frame)
+        if end_index is not None:
+            moves.append((channel.fcurve, end_index, old_end_frame, new_end_frame))
+
+        for fcurve, index, old, new in moves:
+            self.move_keyframe_point(fcurve, index, old, new)
+        fcurve_changed(channel.fcurve)
+        if control.mirrored:
+            fcurve_changed(channel.mirror_fcurve)
 
 class UpdateMarkerLengthJob(Job):
+    priority = PRIORITY_USER
+
     def __init__(self):
         Job.__init__(self, "UPDATE_LENGTH")
 
+    # The relayout reads the marker lengths when it runs, so one pending is enough
+    @property
+    def coalesce_key(self):
+        return "UPDATE_LENGTH"
+
+    def coalesce(self, pending_job):
+        return False
+
     def work(self):
         num_animated_frames = bpy.context.scene.frame_end
         half_point = num_animated_frames / 2
@@ -286,6 +840,8 @@ class UpdateMarkerLengthJob(Job):
             frame_marker.frame = frame
             frame += (frame_marker.length/100.0) * num_animated_frames
 
+        DirtyTracker().mark_all()
+
         bpy.context.scene.timeline_markers.clear()
         for index, marker in enumerate(self.cycler.rig_action.timings.frame_markers):
             marker_1 = bpy.context.scene.timeline_markers.new("{0} 1".format(marker.name), frame=int(marker.frame))
@@ -294,6 +850,8 @@ class UpdateMarkerLengthJob(Job):
                 marker_3 = bpy.context.scene.timeline_markers.new("{0} 1".format(marker.name), frame=num_animated_frames)
 
 class FPSChangedJob(Job):
+    priority = PRIORITY_USER
+
     def __init__(self, animation_length, old_fps, new_fps):
         Job.__init__(self, "FPS_CHANGED")
         self.animation_length = animation_length
@@ -306,6 +864,8 @@ class FPSChangedJob(Job):
         bpy.context.scene.render.fps = self.new_fps
 
 class AnimationLengthChangedJob(Job):
+    priority = PRIORITY_USER
+
     def __init__(self, old_animation_length, new_animation_length, fps):
         Job.__init__(self, "ANIMATION_LENGTH_CHANGED")
         self.old_animation_length = old_animation_length
@@ -317,155 +877,116 @@ class AnimationLengthChangedJob(Job):
         self.work_queue.add(job)
         bpy.context.scene.frame_end = int(self.new_animation_length / self.fps)
 
+# Reads the keyframe points of an fcurve into the flat arrays the planner works on
+def read_keyframe_arrays(fcurve):
+    keyframe_points = fcurve.keyframe_points
+    count = len(keyframe_points)
+    co = np.empty(count * 2, dtype=np.float32)
+    left_handles = np.empty(count * 2, dtype=np.float32)
+    right_handles = np.empty(count * 2, dtype=np.float32)
+    keyframe_points.foreach_get("co", co)
+    keyframe_points.foreach_get("handle_left", left_handles)
+    keyframe_points.foreach_get("handle_right", right_handles)
+    attributes = {}
+    for property_name in ENUM_ATTRIBUTES:
+        attributes[property_name] = np.empty(count, dtype=np.int32)
+        keyframe_points.foreach_get(property_name, attributes[property_name])
+    for property_name in FLOAT_ATTRIBUTES:
+        attributes[property_name] = np.empty(count, dtype=np.float32)
+        keyframe_points.foreach_get(property_name, attributes[property_name])
+    return KeyframeArrays(co[0::2], co[1::2], left_handles, right_handles, attributes)
+
 class AutoUpdateJob(Job):
-    def __init__(self):
+    priority = PRIORITY_BACKGROUND
+
+    def __init__(self, all_dirty=True, dirty_controls=None, dirty_channels=None, fcurves_edited=False):
         Job.__init__(self, "AUTO_UPDATE")
+        self.all_dirty = all_dirty
+        self.dirty_controls = dirty_controls if dirty_controls is not None else set()
+        self.dirty_channels = dirty_channels if dirty_channels is not None else set()
+        self.fcurves_edited = fcurves_edited
+
+    @property
+    def coalesce_key(self):
+        return "AUTO_UPDATE"
+
+    def coalesce(self, pending_job):
+        pending_job.all_dirty |= self.all_dirty
+        pending_job.dirty_controls |= self.dirty_controls
+        pending_job.dirty_channels |= self.dirty_channels
+        pending_job.fcurves_edited |= self.fcurves_edited
+        return False
+
+    @property
+    def dirty(self):
+        return (self.all_dirty, self.dirty_controls, self.dirty_channels, self.fcurves_edited)
+
+    def is_dirty(self, control, channel):
+        if self.all_dirty or control.bone_name in self.dirty_controls or (control.bone_name, channel.type, channel.axis) in self.dirty_channels:
+            return True
+        return self.fcurves_edited and DirtyTracker().channel_changed(channel)
+
+    # Gathers everything the planner needs to know about a channel into plain arrays
+    def channel_plan(self, control, channel):
+        keyframes = list(channel)
+        mirror_keyframes = list(channel.mirror_channel) if control.mirrored else []
+        return ChannelPlan((control.bone_name, channel.type, channel.axis), read_keyframe_arrays(channel.fcurve),
+            [keyframe.frame_marker.frame for keyframe in keyframes], [keyframe.offset for keyframe in keyframes], [keyframe.inverted for keyframe in keyframes],
+            default_value=1.0 if channel.type == "SCALE" else 0.0,
+            mirrored=control.mirrored,
+            mirror_fcurve=read_keyframe_arrays(channel.mirror_fcurve) if control.mirrored else None,
+            mirror_marker_frames=[keyframe.frame_marker.frame for keyframe in mirror_keyframes],
+            mirror_offsets=[keyframe.offset for keyframe in mirror_keyframes],
+            mirror_invert=(channel.type == "LOCATION" and channel.axis == "X") or (channel.type == "ROTATION_EULER" and channel.axis in "YZ"))
 
     def work(self):
-        anim_length = bpy.context.scene.frame_end
-        half_point = anim_length / 2
+        anim_length = self.cycler.rig_action.num_frames
+        plans = []
+        channels = {}
         for control in self.cycler.rig_action.controls:
             for channel in control:
                 # Can't do anything if we need fcurves and can't find them
                 if channel.fcurve is None or (control.mirrored and channel.mirror_fcurve is None):
                     continue
-
-                fcurve_keyframe_points = {keyframe_point.co[0]:keyframe_point for keyframe_point in channel.fcurve.keyframe_points}
-                
-                expected_frames = []
-                for keyframe in channel:
-                    frame = round(keyframe.frame_marker.frame + ((keyframe.offset/100)*anim_length))   
-                    expected_frames.append(frame)
-
-                    # Add Initial Keyframe if it is missing, with a default value of 0.0
-                    if not frame in fcurve_keyframe_points:
-                        value = 0.0
-                        if channel.type == "SCALE":
-                            value = 1.0
-                        self.work_queue.add(AddKeyframeJob(channel.fcurve, frame, value))                  
-
-                    if not control.mirrored:
-                        half_frame = round(frame + half_point)
-                        expected_frames.append(half_frame)
-                        if frame in fcurve_keyframe_points:
-
-                            # Accumulate the values from the keyframe point
-                            value = fcurve_keyframe_points[frame].co[1]
-                            amplitude = fcurve_keyframe_points[frame].amplitude
-                            back = fcurve_keyframe_points[frame].back
-                            easing = fcurve_keyframe_points[frame].easing
-                            left_handle_type = fcurve_keyframe_points[frame].handle_left_type
-                            right_handle_type = fcurve_keyframe_points[frame].handle_right_type
-                            left_handle = [round(fcurve_keyframe_points[frame].handle_left[0]+half_point), fcurve_keyframe_points[frame].handle_left[1]]
-                            right_handle = [round(fcurve_keyframe_points[frame].handle_right[0]+half_point), fcurve_keyframe_points[frame].handle_right[1]]
-                            interpolation = fcurve_keyframe_points[frame].interpolation
-                            period = fcurve_keyframe_points[frame].period
-                            type = fcurve_keyframe_points[frame].type
-
-                            # Invert if we should
-                            if keyframe.inverted:
-                                value = -value
-                                left_handle[1] = -left_handle[1]
-                                right_handle[1] = -right_handle[1]
-
-                            if half_frame in fcurve_keyframe_points:
-                                # frame and half_frame both already exist
-                                self.work_queue.add(ChangeKeyframeValueJob(fcurve_keyframe_points[half_frame], value,
-                                    amplitude=amplitude, back=back, easing=easing, left_handle_type=left_handle_type, right_handle_type=right_handle_type,
-                                    left_handle=left_handle, right_handle=right_handle, interpolation=interpolation, period=period, type=type))
-                            else:
-                                # frame exists but half_frame doesn't                                
-                                self.work_queue.add(AddKeyframeJob(channel.fcurve, half_frame, value,
-                                    amplitude=amplitude, back=back, easing=easing, left_handle_type=left_handle_type, right_handle_type=right_handle_type,
-                                    left_handle=left_handle, right_handle=right_handle, interpolation=interpolation, period=period, type=type))
-                        else:
-                            # We are only missing the original frame
-                            if half_frame in fcurve_keyframe_points:
-                                self.work_queue.add(RemoveKeyframeJob(channel.fcurve, half_frame))
-                            value = 0.0
-                            if channel.type == "SCALE":
-                                value = 1.0
-                            self.work_queue.add(AddKeyframeJob(channel.fcurve, half_frame, value))
-
-                if control.mirrored:
-                    mirror_fcurve_keyframe_points = {keyframe_point.co[0]:keyframe_point for keyframe_point in channel.mirror_channel.fcurve.keyframe_points}
-                    for keyframe in channel.mirror_channel:
-                        frame = round(keyframe.frame_marker.frame + ((keyframe.offset/100)*anim_length))
-                        half_frame = round(frame + half_point)
-                        expected_frames.append(half_frame)
-                        if frame in mirror_fcurve_keyframe_points:
-                            
-                            value = mirror_fcurve_keyframe_points[frame].co[1]
-                            amplitude = mirror_fcurve_keyframe_points[frame].amplitude
-                            back = mirror_fcurve_keyframe_points[frame].back
-                            easing = mirror_fcurve_keyframe_points[frame].easing
-                            left_handle_type = mirror_fcurve_keyframe_points[frame].handle_left_type
-                            right_handle_type = mirror_fcurve_keyframe_points[frame].handle_right_type
-                            left_handle = [round(mirror_fcurve_keyframe_points[frame].handle_left[0]+half_point), mirror_fcurve_keyframe_points[frame].handle_left[1]]
-                            right_handle = [round(mirror_fcurve_keyframe_points[frame].handle_right[0]+half_point), mirror_fcurve_keyframe_points[frame].handle_right[1]]
-                            interpolation = mirror_fcurve_keyframe_points[frame].interpolation
-                            period = mirror_fcurve_keyframe_points[frame].period
-                            type = mirror_fcurve_keyframe_points[frame].type
-
-                            if channel.type == "LOCATION" and channel.axis == "X":
-                                value = -value
-                                left_handle[1] = -left_handle[1]
-                                right_handle[1] = -right_handle[1]
-                            elif channel.type == "ROTATION_EULER" and channel.axis in "YZ":
-                                value = -value
-                                left_handle[1] = -left_handle[1]
-                                right_handle[1] = -right_handle[1]
-
-                            if half_frame in fcurve_keyframe_points:
-                                # frame and half_frame both already exist
-                                self.work_queue.add(ChangeKeyframeValueJob(fcurve_keyframe_points[half_frame], value,
-                                    amplitude=amplitude, back=back, easing=easing, left_handle_type=left_handle_type, right_handle_type=right_handle_type,
-                                    left_handle=left_handle, right_handle=right_handle, interpolation=interpolation, period=period, type=type))
-                            else:
-                                # frame exists but half_frame doesn't                                
-                                self.work_queue.add(AddKeyframeJob(channel.fcurve, half_frame, value,
-                                    amplitude=amplitude, back=back, easing=easing, left_handle_type=left_handle_type, right_handle_type=right_handle_type,
-                                    left_handle=left_handle, right_handle=right_handle, interpolation=interpolation, period=period, type=type))
-                        else: # We are missing the mirror frame, so we just default the value
-                            if half_frame in fcurve_keyframe_points:
-                                self.work_queue.add(RemoveKeyframeJob(channel.fcurve, half_frame))
-                            value = 0.0
-                            if channel.type == "SCALE":
-                                value = 1.0
-                            self.work_queue.add(AddKeyframeJob(channel.fcurve, half_frame, value))
-
-                frame = round(channel.children.children[0].frame_marker.frame + ((channel.children.children[0].offset/100)*anim_length))
-                last_frame = round(frame + anim_length)
-                expected_frames.append(last_frame)
-                if frame in fcurve_keyframe_points:
-                    value = fcurve_keyframe_points[frame].co[1]
-                    amplitude = fcurve_keyframe_points[frame].amplitude
-                    back = fcurve_keyframe_points[frame].back
-                    easing = fcurve_keyframe_points[frame].easing
-                    left_handle_type = fcurve_keyframe_points[frame].handle_left_type
-                    right_handle_type = fcurve_keyframe_points[frame].handle_right_type
-                    left_handle = [round(fcurve_keyframe_points[frame].handle_left[0]+anim_length), fcurve_keyframe_points[frame].handle_left[1]]
-                    right_handle = [round(fcurve_keyframe_points[frame].handle_right[0]+anim_length), fcurve_keyframe_points[frame].handle_right[1]]
-                    interpolation = fcurve_keyframe_points[frame].interpolation
-                    period = fcurve_keyframe_points[frame].period
-                    type = fcurve_keyframe_points[frame].type
-                    if last_frame in fcurve_keyframe_points:
-                        self.work_queue.add(ChangeKeyframeValueJob(fcurve_keyframe_points[last_frame], value,
-                            amplitude=amplitude, back=back, easing=easing, left_handle_type=left_handle_type, right_handle_type=right_handle_type,
-                            left_handle=left_handle, right_handle=right_handle, interpolation=interpolation, period=period, type=type))
-                    else:
-                        self.work_queue.add(AddKeyframeJob(channel.fcurve, last_frame, value,
-                            amplitude=amplitude, back=back, easing=easing, left_handle_type=left_handle_type, right_handle_type=right_handle_type,
-                            left_handle=left_handle, right_handle=right_handle, interpolation=interpolation, period=period, type=type))
-                else:
-                    if last_frame in fcurve_keyframe_points:
-                        self.work_queue.add(RemoveKeyframeJob(channel.fcurve, last_frame))
-                    value = 0.0
-                    if channel.type == "SCALE":
-                        value = 1.0
-                    self.work_queue.add(AddKeyframeJob(channel.fcurve, last_frame, value))
-
-                for frame in fcurve_keyframe_points:
-                    if not frame in expected_frames:
-                        self.work_queue.add(RemoveKeyframeJob(channel.fcurve, frame))
-                self.work_queue.add(UpdateFCurveJob(channel.fcurve))
\ No newline at end of file
+                if len(channel) == 0 or not self.is_dirty(control, channel):
+                    continue
+                plan = self.channel_plan(control, channel)
+                plans.append(plan)
+                channels[plan.key] = channel
+
+        # Channels with writes get their fingerprint once the writes are done, so a write that is cancelled or dropped leaves them changed
+        for diff in plan_keyframes(plans, anim_length):
+            if diff.is_empty:
+                DirtyTracker().store_fingerprint(channels[diff.key])
+            else:
+                self.apply_diff(channels[diff.key].fcurve, diff)
+
+    # Queues the jobs that bring an fcurve in line with what the planner worked out
+    def apply_diff(self, fcurve, diff):
+        if len(diff.removes) > 0:
+            remover = RemoveKeyframesJob(fcurve, diff.removes.tolist())
+            remover.channel_key = diff.key
+            self.work_queue.add(remover)
+
+        writer = WriteKeyframesJob(fcurve)
+        writer.channel_key = diff.key
+        for frame, value in zip(diff.insert_frames.tolist(), diff.insert_values.tolist()):
+            writer.insert(frame, value)
+        attributes = {property_name:values.tolist() for property_name, values in diff.change_attributes.items()}
+        for index, frame in enumerate(diff.change_frames.tolist()):
+            writer.change(frame, float(diff.change_values[index]),
+                left_handle=diff.change_handle_left[index].tolist(), right_handle=diff.change_handle_right[index].tolist(),
+                **{property_name:values[index] for property_name, values in attributes.items()})
+
+        if len(writer) > 0:
+            self.work_queue.add(writer)
+        fcurve_changed(fcurve)
+
+###############################
+#   Register and Unregister   #
+###############################
+def register():
+    Scheduler().start()
+
+def unregister():
+    Scheduler().stop()